@@ -0,0 +1,41 @@
+"""add refreshtoken.session_id + revokedsession table
+
+Revision ID: 5a1c7e3d9b20
+Revises: 2f3b9d5a6c4e
+Create Date: 2026-03-02 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "5a1c7e3d9b20"
+down_revision = "2f3b9d5a6c4e"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # existing refresh tokens have no session; they get one on their next rotation
+    op.add_column("refreshtoken", sa.Column("session_id", sa.Uuid(), nullable=True))
+    op.create_index("ix_refreshtoken_session_id", "refreshtoken", ["session_id"], unique=False)
+
+    op.create_table(
+        "revokedsession",
+        sa.Column("session_id", sa.Uuid(), nullable=False),
+        sa.Column("user_id", sa.Uuid(), nullable=False),
+        sa.Column("revoked_at", sa.DateTime(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"]),
+        sa.PrimaryKeyConstraint("session_id"),
+    )
+    # workers poll `revoked_at > watermark`; pruning scans `expires_at`
+    op.create_index("ix_revokedsession_revoked_at", "revokedsession", ["revoked_at"], unique=False)
+    op.create_index("ix_revokedsession_expires_at", "revokedsession", ["expires_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_revokedsession_expires_at", table_name="revokedsession")
+    op.drop_index("ix_revokedsession_revoked_at", table_name="revokedsession")
+    op.drop_table("revokedsession")
+    op.drop_index("ix_refreshtoken_session_id", table_name="refreshtoken")
+    op.drop_column("refreshtoken", "session_id")
@@ -0,0 +1,45 @@
+"""add postscore + trendingpost tables
+
+Revision ID: 8d4e2b6f1a37
+Revises: 5a1c7e3d9b20
+Create Date: 2026-03-09 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "8d4e2b6f1a37"
+down_revision = "5a1c7e3d9b20"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "postscore",
+        sa.Column("post_id", sa.Uuid(), nullable=False),
+        sa.Column("log_score", sa.Float(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["post_id"], ["post.id"]),
+        sa.PrimaryKeyConstraint("post_id"),
+    )
+    # materialization reads the highest scores first
+    op.create_index("ix_postscore_log_score", "postscore", ["log_score"], unique=False)
+
+    op.create_table(
+        "trendingpost",
+        sa.Column("rank", sa.Integer(), nullable=False),
+        sa.Column("post_id", sa.Uuid(), nullable=False),
+        sa.Column("log_score", sa.Float(), nullable=False),
+        sa.Column("materialized_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["post_id"], ["post.id"]),
+        sa.PrimaryKeyConstraint("rank"),
+    )
+    # existing likes/comments/bookmarks are scored with
+    # `python -m server.services.trending --rebuild`
+
+
+def downgrade() -> None:
+    op.drop_table("trendingpost")
+    op.drop_index("ix_postscore_log_score", table_name="postscore")
+    op.drop_table("postscore")
@@ -0,0 +1,39 @@
+"""add indexes for feeds
+
+Revision ID: a4d8e1f7c962
+Revises: f1a6d3c8b527
+Create Date: 2026-04-13 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "a4d8e1f7c962"
+down_revision = "f1a6d3c8b527"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_post_published_at",
+        "post",
+        ["published_at"],
+        unique=False,
+        postgresql_where=sa.text("status = 'published'"),
+    )
+    op.create_index(
+        "ix_post_author_id_published_at",
+        "post",
+        ["author_id", "published_at"],
+        unique=False,
+        postgresql_where=sa.text("status = 'published'"),
+    )
+    # the primary key (post_id, tag_id) can't serve lookups by tag
+    op.create_index("ix_posttag_tag_id", "posttag", ["tag_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_posttag_tag_id", table_name="posttag")
+    op.drop_index("ix_post_author_id_published_at", table_name="post")
+    op.drop_index("ix_post_published_at", table_name="post")
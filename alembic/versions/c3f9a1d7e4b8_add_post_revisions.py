@@ -0,0 +1,38 @@
+"""add postrevision table
+
+Revision ID: c3f9a1d7e4b8
+Revises: 8d4e2b6f1a37
+Create Date: 2026-03-23 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "c3f9a1d7e4b8"
+down_revision = "8d4e2b6f1a37"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "postrevision",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("post_id", sa.Uuid(), nullable=False),
+        sa.Column("number", sa.Integer(), nullable=False),
+        sa.Column("snapshot_number", sa.Integer(), nullable=False),
+        sa.Column("author_id", sa.Uuid(), nullable=True),
+        sa.Column("data", sa.LargeBinary(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["post_id"], ["post.id"]),
+        sa.ForeignKeyConstraint(["author_id"], ["user.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        # also serves the (post_id, number) range scans used for reconstruction
+        sa.UniqueConstraint("post_id", "number"),
+    )
+    # `data` is already zlib-compressed; skip TOAST's own compression attempt
+    op.execute("ALTER TABLE postrevision ALTER COLUMN data SET STORAGE EXTERNAL")
+
+
+def downgrade() -> None:
+    op.drop_table("postrevision")
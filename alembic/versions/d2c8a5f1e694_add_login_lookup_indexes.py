@@ -0,0 +1,27 @@
+"""add user.email, user.username and refreshtoken.token_hash indexes
+
+Revision ID: d2c8a5f1e694
+Revises: b9e3f6a2d715
+Create Date: 2026-04-27 00:00:00.000000
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "d2c8a5f1e694"
+down_revision = "b9e3f6a2d715"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # login, refresh and author feeds looked these up with a sequential scan
+    # (found by scripts/check_query_plans.py)
+    op.create_index("ix_user_email", "user", ["email"], unique=False)
+    op.create_index("ix_user_username", "user", ["username"], unique=False)
+    op.create_index("ix_refreshtoken_token_hash", "refreshtoken", ["token_hash"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_refreshtoken_token_hash", table_name="refreshtoken")
+    op.drop_index("ix_user_username", table_name="user")
+    op.drop_index("ix_user_email", table_name="user")
@@ -0,0 +1,147 @@
+"""range-partition comment and postlike by month
+
+Revision ID: e5f2a9c7b3d1
+Revises: d2c8a5f1e694
+Create Date: 2026-05-04 00:00:00.000000
+
+Rebuilds both tables as declaratively partitioned tables (RANGE on
+created_at, one partition per month plus a default one) and copies the rows
+over; the primary keys become (id, created_at). The partitions are created
+from the month of the oldest row to MONTHS_AHEAD months from now, later ones
+by services.partitions. Both tables are locked for the duration of the copy.
+comment.parent_id loses its foreign key: partitioned tables can't be
+referenced by one that leaves out created_at.
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+# revision identifiers, used by Alembic.
+revision = "e5f2a9c7b3d1"
+down_revision = "d2c8a5f1e694"
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+
+
+# constraint names given explicitly: the old table still holds the defaults
+# while the new one is created
+def comment_columns() -> list:
+    return [
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("post_id", sa.Uuid(), nullable=False),
+        sa.Column("author_id", sa.Uuid(), nullable=True),
+        sa.Column("parent_id", sa.Uuid(), nullable=True),
+        sa.Column("content", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("is_moderated", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["author_id"], ["user.id"], name="comment_author_id_fkey"),
+        sa.ForeignKeyConstraint(["post_id"], ["post.id"], name="comment_post_id_fkey"),
+    ]
+
+
+def postlike_columns() -> list:
+    return [
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("user_id", sa.Uuid(), nullable=False),
+        sa.Column("post_id", sa.Uuid(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["post_id"], ["post.id"], name="postlike_post_id_fkey"),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"], name="postlike_user_id_fkey"),
+    ]
+
+
+COMMENT_COLUMNS = "id, post_id, author_id, parent_id, content, is_moderated, created_at, updated_at"
+POSTLIKE_COLUMNS = "id, user_id, post_id, created_at"
+
+
+def create_comment_indexes() -> None:
+    op.create_index("ix_comment_approved", "comment", ["post_id", "created_at"], postgresql_where=sa.text("is_moderated"))
+    op.create_index("ix_comment_pending", "comment", ["created_at"], postgresql_where=sa.text("NOT is_moderated"))
+
+
+def create_partitions(table: str, source: str) -> None:
+    """Monthly partitions covering the rows of `source` up to MONTHS_AHEAD months out."""
+    op.execute(
+        f"""
+        DO $$
+        DECLARE
+            month timestamp;
+        BEGIN
+            FOR month IN SELECT generate_series(
+                date_trunc('month', least((SELECT min(created_at) FROM {source}), now() AT TIME ZONE 'utc')),
+                date_trunc('month', now() AT TIME ZONE 'utc') + interval '{MONTHS_AHEAD} months',
+                interval '1 month'
+            ) LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF {table} FOR VALUES FROM (%L) TO (%L)',
+                    '{table}_' || to_char(month, 'YYYYMM'), month, month + interval '1 month'
+                );
+            END LOOP;
+        END $$
+        """
+    )
+    op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+
+def upgrade() -> None:
+    op.execute("LOCK TABLE comment, postlike IN EXCLUSIVE MODE")
+    # free the names (indexes and constraints share a namespace with tables)
+    op.drop_index("ix_comment_pending", table_name="comment")
+    op.drop_index("ix_comment_approved", table_name="comment")
+    op.rename_table("comment", "comment_old")
+    op.execute("ALTER TABLE comment_old RENAME CONSTRAINT comment_pkey TO comment_old_pkey")
+    op.rename_table("postlike", "postlike_old")
+    op.execute("ALTER TABLE postlike_old RENAME CONSTRAINT postlike_pkey TO postlike_old_pkey")
+
+    op.create_table(
+        "comment",
+        *comment_columns(),
+        sa.PrimaryKeyConstraint("id", "created_at"),
+        postgresql_partition_by="RANGE (created_at)",
+    )
+    op.create_table(
+        "postlike",
+        *postlike_columns(),
+        sa.PrimaryKeyConstraint("id", "created_at"),
+        postgresql_partition_by="RANGE (created_at)",
+    )
+    create_partitions("comment", "comment_old")
+    create_partitions("postlike", "postlike_old")
+
+    op.execute(f"INSERT INTO comment ({COMMENT_COLUMNS}) SELECT {COMMENT_COLUMNS} FROM comment_old")
+    op.execute(f"INSERT INTO postlike ({POSTLIKE_COLUMNS}) SELECT {POSTLIKE_COLUMNS} FROM postlike_old")
+    op.drop_table("comment_old")
+    op.drop_table("postlike_old")
+    # built after the copy: one sort per partition instead of row-by-row inserts
+    create_comment_indexes()
+    op.execute("ANALYZE comment")
+    op.execute("ANALYZE postlike")
+
+
+def downgrade() -> None:
+    # archived partitions (services.partitions) are not brought back; restore
+    # them first if replies to archived comments remain, or the parent_id
+    # foreign key fails
+    op.execute("LOCK TABLE comment, postlike IN EXCLUSIVE MODE")
+    op.drop_index("ix_comment_pending", table_name="comment")
+    op.drop_index("ix_comment_approved", table_name="comment")
+    op.rename_table("comment", "comment_partitioned")
+    op.execute("ALTER TABLE comment_partitioned RENAME CONSTRAINT comment_pkey TO comment_partitioned_pkey")
+    op.rename_table("postlike", "postlike_partitioned")
+    op.execute("ALTER TABLE postlike_partitioned RENAME CONSTRAINT postlike_pkey TO postlike_partitioned_pkey")
+
+    op.create_table(
+        "comment",
+        *comment_columns(),
+        sa.ForeignKeyConstraint(["parent_id"], ["comment.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table("postlike", *postlike_columns(), sa.PrimaryKeyConstraint("id"))
+    op.execute(f"INSERT INTO comment ({COMMENT_COLUMNS}) SELECT {COMMENT_COLUMNS} FROM comment_partitioned")
+    op.execute(f"INSERT INTO postlike ({POSTLIKE_COLUMNS}) SELECT {POSTLIKE_COLUMNS} FROM postlike_partitioned")
+    op.drop_table("comment_partitioned")
+    op.drop_table("postlike_partitioned")
+    create_comment_indexes()
@@ -0,0 +1,30 @@
+"""add postviewstats table
+
+Revision ID: e7b2c5a9d318
+Revises: c3f9a1d7e4b8
+Create Date: 2026-03-30 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "e7b2c5a9d318"
+down_revision = "c3f9a1d7e4b8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "postviewstats",
+        sa.Column("post_id", sa.Uuid(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("views", sa.BigInteger(), nullable=False),
+        sa.Column("visitors", sa.LargeBinary(), nullable=False),
+        sa.ForeignKeyConstraint(["post_id"], ["post.id"]),
+        sa.PrimaryKeyConstraint("post_id", "day"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("postviewstats")
@@ -0,0 +1,48 @@
+"""Autosave request size and patch cost: full PUT vs JSON Patch (services.autosave).
+
+Simulates an author typing into one block of a long post, autosaving after
+each --keystrokes-per-save keystrokes, and compares bytes sent by resending
+the whole content_json against sending a `replace` patch for the edited
+block. Also reports the CPU cost of applying one patch to the cached document.
+
+Usage: python scripts/bench_autosave.py [--blocks 2000] [--saves 100]
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from server.core.json_patch import apply_patch  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blocks", type=int, default=2000)
+    parser.add_argument("--saves", type=int, default=100)
+    parser.add_argument("--keystrokes-per-save", type=int, default=20)
+    args = parser.parse_args()
+
+    doc = {"blocks": [{"type": "paragraph", "children": [{"text": f"Paragraph {i}. " + "lorem ipsum " * 15}]} for i in range(args.blocks)]}
+    target = args.blocks // 2
+    put_bytes = patch_bytes = 0
+    apply_seconds = 0.0
+    for save in range(args.saves):
+        text = doc["blocks"][target]["children"][0]["text"] + "x" * args.keystrokes_per_save
+        patch = [{"op": "replace", "path": f"/blocks/{target}/children/0/text", "value": text}]
+        start = time.perf_counter()
+        doc = apply_patch(doc, patch)
+        apply_seconds += time.perf_counter() - start
+        put_bytes += len(json.dumps({"content_json": doc}))
+        patch_bytes += len(json.dumps(patch))
+
+    print(f"document: {len(json.dumps(doc)) / 1024:.0f} KB, {args.saves} saves")
+    print(f"full PUT:   {put_bytes / args.saves / 1024:>8.1f} KB/save")
+    print(f"JSON Patch: {patch_bytes / args.saves / 1024:>8.2f} KB/save ({put_bytes / patch_bytes:.0f}x smaller)")
+    print(f"apply_patch: {apply_seconds / args.saves * 1e6:.0f} us/save")
+
+
+if __name__ == "__main__":
+    main()
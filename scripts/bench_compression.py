@@ -0,0 +1,73 @@
+"""Bytes on the wire and CPU per request for post reads (core.http_cache).
+
+Renders a synthetic post of roughly --kb kilobytes and, for every available
+encoding, reports the response size plus CPU time for a cold request (render +
+compress) and a warm request (served from the encoded-body cache). A 304
+revalidation is measured as well.
+
+Usage: python scripts/bench_compression.py [--kb 300] [--requests 200]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from uuid import uuid4
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DATABASE_URL", "postgresql+asyncpg://bench@localhost/bench")
+os.environ.setdefault("JWT_SECRET", "bench")
+
+from starlette.requests import Request  # noqa: E402
+
+from server.core.http_cache import ENCODERS, IDENTITY, conditional_response, get_body_cache  # noqa: E402
+from server.models.post import Post  # noqa: E402
+
+
+def make_post(kb: int) -> Post:
+    paragraph = "<p>Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor. </p>"
+    html = paragraph * (kb * 1024 // 2 // len(paragraph))
+    blocks = [{"type": "paragraph", "children": [{"text": f"Block {i} lorem ipsum dolor sit amet."}]} for i in range(kb * 1024 // 2 // 70)]
+    return Post(author_id=uuid4(), title="Benchmark", slug="benchmark", short_id="bench", content_html=html,
+                content_json={"blocks": blocks}, updated_at=datetime(2026, 1, 1))
+
+
+def make_request(headers: dict[str, str]) -> Request:
+    raw = [(k.lower().encode(), v.encode()) for k, v in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+def cpu_per_request(post: Post, headers: dict[str, str], requests: int, cold: bool) -> tuple[float, int]:
+    size = 0
+    start = time.process_time()
+    for _ in range(requests):
+        if cold:
+            get_body_cache().clear()
+        response = conditional_response(make_request(headers), post.id, post.updated_at, lambda: post.model_dump_json().encode())
+        size = len(response.body)
+    return (time.process_time() - start) / requests * 1e6, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--kb", type=int, default=300)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    post = make_post(args.kb)
+    print(f"{'encoding':<10}{'wire bytes':>12}{'cold us/req':>14}{'warm us/req':>14}")
+    for encoding in [IDENTITY, *ENCODERS]:
+        headers = {"Accept-Encoding": encoding}
+        cold, size = cpu_per_request(post, headers, max(args.requests // 10, 1), cold=True)
+        warm, _ = cpu_per_request(post, headers, args.requests, cold=False)
+        print(f"{encoding:<10}{size:>12}{cold:>14.0f}{warm:>14.1f}")
+
+    response = conditional_response(make_request({}), post.id, post.updated_at, lambda: post.model_dump_json().encode())
+    etag = response.headers["etag"]
+    revalidate, size = cpu_per_request(post, {"If-None-Match": etag}, args.requests, cold=False)
+    print(f"{'304':<10}{size:>12}{'-':>14}{revalidate:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Cold-import budget check for the server package.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter for
+each target (median of --runs), prints the cumulative import time and the
+heaviest dependencies, and exits non-zero when a target exceeds its budget so
+CI can enforce it. Importing must not require DATABASE_URL/JWT_SECRET, build
+the engine or the password context; those are constructed on first use.
+
+Usage: python scripts/bench_import.py [--runs 5] [--scale 1.0] [--top 10]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# cumulative milliseconds on a typical dev laptop; use --scale on slower CI runners
+BUDGETS_MS = {
+    "server.core.config": 250,
+    "server.core.security": 300,
+    "server.core.db": 700,
+    "server.models": 700,
+    "server.main": 1400,
+}
+
+
+def import_times(module: str) -> dict[str, int]:
+    """Cumulative microseconds per module for one cold import of `module`."""
+    env = {k: v for k, v in os.environ.items() if k not in ("DATABASE_URL", "JWT_SECRET")}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    times: dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        try:
+            times[name.strip()] = int(cumulative)
+        except ValueError:
+            continue  # header line
+    return times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every budget")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    failed = False
+    for module, budget in BUDGETS_MS.items():
+        runs = [import_times(module) for _ in range(args.runs)]
+        total_ms = statistics.median(r[module] for r in runs) / 1000
+        limit = budget * args.scale
+        status = "ok" if total_ms <= limit else "OVER BUDGET"
+        failed |= total_ms > limit
+        print(f"{module:<24}{total_ms:>8.0f} ms  (budget {limit:.0f} ms)  {status}")
+        if args.top:
+            heaviest = sorted(runs[-1].items(), key=lambda kv: kv[1], reverse=True)[1 : args.top + 1]
+            for name, us in heaviest:
+                print(f"    {name:<44}{us / 1000:>8.1f} ms")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
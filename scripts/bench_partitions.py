@@ -0,0 +1,126 @@
+"""Insert throughput and index size of the comment table layouts.
+
+Fills three comment-shaped tables in a scratch schema with --rows rows each,
+--batch rows per executemany round trip, and reports rows/s and the table
+and index sizes (summed over partitions):
+
+- uuid4: random primary keys in one table (the layout before partitioning)
+- uuid7: time-ordered primary keys (core.utils.uuid7) in one table
+- partitioned: time-ordered keys, RANGE-partitioned by month (the current layout)
+
+Each has the primary key and the ix_comment_approved index. Rows are
+inserted in created_at order, spread over --months months, with uuid7 ids
+generated for their created_at. The schema is dropped afterwards.
+
+Usage: DATABASE_URL=postgresql+asyncpg://postgres@localhost/bench \\
+    python scripts/bench_partitions.py [--rows 1000000] [--batch 1000] [--months 12]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from uuid import uuid4
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DATABASE_URL", "postgresql+asyncpg://bench@localhost/bench")
+os.environ.setdefault("JWT_SECRET", "bench")
+
+from server.core.db import get_engine  # noqa: E402
+from server.core.utils import uuid7  # noqa: E402
+from server.services.partitions import add_months  # noqa: E402
+
+SCHEMA = "bench_partitions"
+START = datetime(2025, 1, 1)
+POSTS = 10_000
+COLUMNS = """
+    id uuid NOT NULL, post_id uuid NOT NULL, author_id uuid, parent_id uuid, content varchar NOT NULL,
+    is_moderated boolean NOT NULL, created_at timestamp NOT NULL, updated_at timestamp
+"""
+INSERT = (
+    "INSERT INTO {table} (id, post_id, author_id, content, is_moderated, created_at) "
+    "VALUES ($1, $2, $3, $4, $5, $6)"
+)
+
+
+def layout_ddl(name: str, months: int) -> list[str]:
+    table = f"{SCHEMA}.{name}"
+    if name != "partitioned":
+        return [
+            f"CREATE TABLE {table} ({COLUMNS}, PRIMARY KEY (id))",
+            f"CREATE INDEX ON {table} (post_id, created_at) WHERE is_moderated",
+        ]
+    ddl = [
+        f"CREATE TABLE {table} ({COLUMNS}, PRIMARY KEY (id, created_at)) PARTITION BY RANGE (created_at)",
+        f"CREATE INDEX ON {table} (post_id, created_at) WHERE is_moderated",
+    ]
+    for offset in range(months):
+        month = add_months(START.date(), offset)
+        ddl.append(
+            f"CREATE TABLE {table}_{month:%Y%m} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+        )
+    return ddl
+
+
+async def fill(raw, name: str, rows: int, batch: int, months: int) -> float:
+    span = add_months(START.date(), months) - START.date()
+    step = span / rows
+    post_ids = [uuid4() for _ in range(POSTS)]
+    author_id = uuid4()
+    statement = INSERT.format(table=f"{SCHEMA}.{name}")
+    elapsed = 0.0
+    for first in range(0, rows, batch):
+        records = []
+        for i in range(first, min(first + batch, rows)):
+            created_at = START + i * step
+            row_id = uuid4() if name == "uuid4" else uuid7(created_at)
+            records.append((row_id, post_ids[i % POSTS], author_id, "Nice post, thanks!", i % 5 != 0, created_at))
+        # only the round trips are timed, not building the rows
+        start = time.perf_counter()
+        await raw.executemany(statement, records)
+        elapsed += time.perf_counter() - start
+    return elapsed
+
+
+async def sizes(raw, name: str) -> tuple[int, int]:
+    """Table and index bytes, summed over the partitions of a partitioned table."""
+    row = await raw.fetchrow(
+        "SELECT sum(pg_table_size(relid)), sum(pg_indexes_size(relid)) "
+        "FROM (SELECT $1::regclass AS relid UNION SELECT relid FROM pg_partition_tree($1::regclass)) AS tree",
+        f"{SCHEMA}.{name}",
+    )
+    return row[0], row[1]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--months", type=int, default=12)
+    args = parser.parse_args()
+
+    async with get_engine().connect() as conn:
+        raw = (await conn.get_raw_connection()).driver_connection
+        await raw.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE; CREATE SCHEMA {SCHEMA}")
+        try:
+            print(f"{args.rows} rows, {args.batch} per round trip, over {args.months} months")
+            for name in ("uuid4", "uuid7", "partitioned"):
+                for statement in layout_ddl(name, args.months):
+                    await raw.execute(statement)
+                elapsed = await fill(raw, name, args.rows, args.batch, args.months)
+                await raw.execute(f"VACUUM ANALYZE {SCHEMA}.{name}")
+                table_bytes, index_bytes = await sizes(raw, name)
+                print(
+                    f"{name:>12}: {args.rows / elapsed:9,.0f} rows/s, "
+                    f"table {table_bytes / 2**20:7.1f} MiB, indexes {index_bytes / 2**20:7.1f} MiB"
+                )
+        finally:
+            await raw.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    await get_engine().dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+"""Storage overhead and reconstruction latency of post revisions (services.revisions).
+
+Builds --revisions autosave-style revisions of a long post in memory (each
+edit types a few words into one paragraph, occasionally retitling), encoded
+exactly as record_revision stores them, then reports bytes stored per edit
+and the time to rebuild random revisions from their snapshot.
+
+Usage: python scripts/bench_revisions.py [--revisions 1200] [--snapshot-every 25]
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from uuid import uuid4
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from server.core.utils import get_utc_now  # noqa: E402
+from server.models.post_revision import PostRevision  # noqa: E402
+from server.services.revisions import encode_delta, encode_snapshot, rebuild  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--revisions", type=int, default=1200)
+    parser.add_argument("--snapshot-every", type=int, default=25)
+    parser.add_argument("--paragraphs", type=int, default=400)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    paragraphs = [f"Paragraph {i}: " + " ".join(rng.choice(["lorem", "ipsum", "dolor", "sit", "amet"]) for _ in range(40)) for i in range(args.paragraphs)]
+    fields = {
+        "title": "Draft",
+        "summary": "A long post",
+        "content_html": "".join(f"<p>{p}</p>" for p in paragraphs),
+        "content_json": {"blocks": [{"type": "paragraph", "text": p} for p in paragraphs]},
+    }
+
+    post_id, now = uuid4(), get_utc_now()
+    rows: list[PostRevision] = []
+    expected = []
+    snapshot_number = 1
+    for number in range(1, args.revisions + 1):
+        if number > 1:
+            before = fields
+            i = rng.randrange(args.paragraphs)
+            paragraphs[i] += " " + " ".join(rng.choice(["new", "words", "typed"]) for _ in range(3))
+            blocks = list(before["content_json"]["blocks"])
+            blocks[i] = {"type": "paragraph", "text": paragraphs[i]}
+            fields = {
+                **before,
+                "title": f"Draft {number}" if number % 100 == 0 else before["title"],
+                "content_html": "".join(f"<p>{p}</p>" for p in paragraphs),
+                "content_json": {"blocks": blocks},
+            }
+        if number == 1 or number - snapshot_number >= args.snapshot_every:
+            snapshot_number = number
+            data = encode_snapshot(fields)
+        else:
+            data = encode_delta(before, fields)
+        rows.append(PostRevision(post_id=post_id, number=number, snapshot_number=snapshot_number, data=data, created_at=now))
+        expected.append(fields)
+
+    snapshots = [len(r.data) for r in rows if r.number == r.snapshot_number]
+    deltas = [len(r.data) for r in rows if r.number != r.snapshot_number]
+    full_copy = sum(len(encode_snapshot(f)) for f in expected[:50]) / 50
+    stored = sum(snapshots) + sum(deltas)
+    print(f"{len(rows)} revisions, snapshot every {args.snapshot_every}")
+    print(f"full compressed copy: {full_copy / 1024:.1f} KB; delta median {statistics.median(deltas)} B")
+    print(f"stored per edit: {stored / len(rows) / 1024:.2f} KB ({full_copy * len(rows) / stored:.0f}x less than full copies)")
+
+    latencies = []
+    for number in rng.sample(range(1, len(rows) + 1), 200):
+        target = rows[number - 1]
+        chain = rows[target.snapshot_number - 1 : number]
+        start = time.perf_counter()
+        result = rebuild(chain)
+        latencies.append(time.perf_counter() - start)
+        assert result == {k: expected[number - 1][k] for k in result}, number
+    latencies.sort()
+    print(f"rebuild: median {statistics.median(latencies) * 1000:.2f} ms, p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Sitemap generation over a large post table (services.feeds).
+
+Renders every shard of a sitemap for --posts synthetic rows through
+render_urlset, the same encoder the shard endpoint feeds from its
+server-side cursor, and compares time and peak memory with building the
+whole document from a materialized row list (what a list_posts-style
+implementation does). Rows are produced lazily per partition, like a
+cursor, so the streamed figure is the renderer's own footprint (row
+construction is included in both timings).
+
+Usage: python scripts/bench_sitemap.py [--posts 1000000]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+from collections import namedtuple
+from datetime import datetime, timedelta
+from pathlib import Path
+from uuid import UUID
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DATABASE_URL", "postgresql+asyncpg://bench@localhost/bench")
+os.environ.setdefault("JWT_SECRET", "bench")
+
+from server.core.config import get_settings  # noqa: E402
+from server.services.feeds import PARTITION_SIZE, render_urlset  # noqa: E402
+
+Row = namedtuple("Row", "id short_id slug changed_at")
+START = datetime(2024, 1, 1)
+
+
+def make_row(i: int) -> Row:
+    post_id = UUID(int=i << 64 | 0x4000_8000_0000_0000)
+    return Row(post_id, str(post_id).split("-")[0], f"post-number-{i}-about-something", START + timedelta(minutes=i))
+
+
+async def cursor(first: int, count: int):
+    for offset in range(first, first + count, PARTITION_SIZE):
+        yield [make_row(i) for i in range(offset, min(offset + PARTITION_SIZE, first + count))]
+
+
+async def streamed(posts: int, shard_size: int) -> int:
+    size = 0
+    for first in range(0, posts, shard_size):
+        async for chunk in render_urlset(cursor(first, min(shard_size, posts - first))):
+            size += len(chunk)  # sent to the client and dropped
+    return size
+
+
+async def materialized(posts: int, shard_size: int) -> int:
+    rows = [make_row(i) for i in range(posts)]
+
+    async def one_partition(part):
+        yield part
+
+    size = 0
+    for first in range(0, posts, shard_size):
+        size += len(b"".join([chunk async for chunk in render_urlset(one_partition(rows[first:first + shard_size]))]))
+    return size
+
+
+def measure(label: str, fn, posts: int, shard_size: int) -> None:
+    start = time.perf_counter()
+    size = asyncio.run(fn(posts, shard_size))
+    elapsed = time.perf_counter() - start
+    # separate run: tracing allocations slows everything down severalfold
+    tracemalloc.start()
+    asyncio.run(fn(posts, shard_size))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:>12}: {elapsed:6.2f} s, {size / 2**20:7.1f} MiB of XML, peak {peak / 2**20:7.1f} MiB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posts", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    shard_size = get_settings().SITEMAP_SHARD_SIZE
+    print(f"{args.posts} posts, {-(-args.posts // shard_size)} shards of up to {shard_size} URLs")
+    measure("streamed", streamed, args.posts, shard_size)
+    measure("materialized", materialized, args.posts, shard_size)
+
+
+if __name__ == "__main__":
+    main()
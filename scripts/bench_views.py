@@ -0,0 +1,72 @@
+"""Overhead of view counting on the post read path (services.views).
+
+Times post_response (conditional GET + cached body, as used by get_post)
+with the view counter enabled against the same call with counting stubbed
+out, and reports HyperLogLog accuracy for a few visitor counts.
+
+Usage: python scripts/bench_views.py [--requests 100000] [--posts 1000]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from uuid import uuid4
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DATABASE_URL", "postgresql+asyncpg://bench@localhost/bench")
+os.environ.setdefault("JWT_SECRET", "bench")
+
+from starlette.requests import Request  # noqa: E402
+
+from server.api import posts  # noqa: E402
+from server.core.hyperloglog import HyperLogLog  # noqa: E402
+from server.models.post import Post  # noqa: E402
+from server.services.views import ViewCounter  # noqa: E402
+
+
+class _NoCounter:
+    def record(self, *args) -> None:
+        pass
+
+
+def make_request(i: int) -> Request:
+    headers = [(b"user-agent", f"bench-agent/{i % 50}".encode())]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers, "client": (f"10.0.{i % 256}.{i % 251}", 1234)})
+
+
+def time_reads(post_list: list[Post], requests: list[Request]) -> float:
+    start = time.perf_counter()
+    for i, request in enumerate(requests):
+        posts.post_response(request, post_list[i % len(post_list)])
+    return (time.perf_counter() - start) / len(requests) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=100_000)
+    parser.add_argument("--posts", type=int, default=1000)
+    args = parser.parse_args()
+
+    post_list = [Post(author_id=uuid4(), title="t", slug="t", short_id="s", content_html="<p>x</p>" * 50, created_at=datetime(2026, 1, 1)) for _ in range(args.posts)]
+    requests = [make_request(i) for i in range(args.requests)]
+
+    posts.get_view_counter = lambda: _NoCounter()
+    time_reads(post_list, requests)  # fill the body cache and warm up
+    baseline = time_reads(post_list, requests)
+    counter = ViewCounter()
+    posts.get_view_counter = lambda: counter
+    counted = time_reads(post_list, requests)
+    print(f"post_response: {baseline:.1f} us without counting, {counted:.1f} us with (+{counted - baseline:.1f} us)")
+    print(f"buffered keys after {args.requests} views: {len(counter._views)}")
+
+    for n in (100, 10_000, 1_000_000):
+        sketch = HyperLogLog()
+        for i in range(n):
+            sketch.add(f"visitor-{i}")
+        print(f"HLL {n:>9} distinct -> {sketch.count():>9} ({(sketch.count() - n) / n:+.2%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+"""Query-count and query-plan regression check for the hot endpoints.
+
+Migrates (alembic upgrade head) and seeds a dedicated local Postgres, calls
+each scenario below through the ASGI app, captures every SQL statement with
+an engine event and EXPLAINs it with the parameters it ran with. Exits
+non-zero when a scenario
+
+- issues more statements than its snapshot (an N+1 or an extra round trip),
+- seq-scans a table estimated above --seq-scan-rows rows (unless the scenario
+  allows that table), or
+- no longer uses an index its snapshot plan used (e.g. ix_post_short_id).
+
+Partitions and their indexes are shown under the partitioned table's and
+index's names, partitions scanned alike are listed once and empty ones
+(upcoming months, the default partition) are left out, so snapshots don't
+change as monthly partitions are added; the seq-scan limit still applies to
+each partition's own size.
+
+Other plan changes are reported for review. Snapshots live in
+scripts/query_plans/<scenario>.json; after an intended change rerun with
+--update and commit the diff.
+
+The database is TRUNCATEd and reseeded when the current month's partition
+holds fewer than SEED_MONTH_COMMENTS comments (so also when empty, and after
+the month changes) or with --reseed, so never point this at data you care
+about.
+
+Usage: DATABASE_URL=postgresql+asyncpg://postgres@localhost/plans \\
+    python scripts/check_query_plans.py [--update] [--reseed] [--seq-scan-rows 1000]
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parents[1]
+SNAPSHOTS = Path(__file__).resolve().parent / "query_plans"
+
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("JWT_SECRET", "plans")
+
+import httpx  # noqa: E402
+from sqlalchemy import event, text  # noqa: E402
+
+from server.core.config import get_settings  # noqa: E402
+from server.core.db import async_session, get_engine  # noqa: E402
+from server.core.security import get_password_hash  # noqa: E402
+from server.main import app  # noqa: E402
+from server.services.partitions import ensure_partitions  # noqa: E402
+
+USERS = 2_000
+POSTS = 20_000
+COMMENTS = 40_000
+TAGS = 50
+REFRESH_TOKENS = 20_000
+# comments seeded into the current month, which add_comment writes to; well
+# above --seq-scan-rows so its partition is planned like a real one
+SEED_MONTH_COMMENTS = COMMENTS // 4
+PASSWORD = "password"
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    path: str
+    json: Any = None
+    auth: bool = False
+    status: int = 200
+    # tables this endpoint is known to scan in full, with the reason
+    allow_seq_scan: dict[str, str] = field(default_factory=dict)
+    # merge the JSON response into the context for later scenarios
+    remember: bool = False
+
+
+SCENARIOS = [
+    Scenario("list_posts", "GET", "/api/posts/", allow_seq_scan={"post": "unpaginated: returns every published post"}),
+    Scenario("get_post", "GET", "/api/posts/{post_id}"),
+    Scenario("get_post_by_short", "GET", "/api/posts/short/{short_id}"),
+    Scenario("login", "POST", "/api/auth/login", json={"email": "{email}", "password": PASSWORD}, remember=True),
+    Scenario("refresh", "POST", "/api/auth/refresh", json={"refresh_token": "{refresh_token}"}),
+    Scenario("add_comment", "POST", "/api/posts/{post_id}/comments/", json={"content": "Nice post"}, auth=True, status=201),
+    Scenario("list_comments", "GET", "/api/posts/{post_id}/comments/"),
+    Scenario("feed", "GET", "/feed.xml"),
+    Scenario("author_feed", "GET", "/feed.xml?author=user1"),
+]
+
+TRUNCATE = (
+    "TRUNCATE \"user\", post, comment, tag, posttag, refreshtoken, revokedsession, postlike, bookmark, media, "
+    "postrevision, postviewstats, postscore, trendingpost, outboxevent CASCADE"
+)
+MONTH_START = "date_trunc('month', now() AT TIME ZONE 'utc')"
+SEED = [
+    f"""INSERT INTO "user" (id, email, username, password_hash, is_active, is_admin, created_at)
+        SELECT md5('user' || i)::uuid, 'user' || i || '@example.com', 'user' || i, :password_hash, true, false,
+               timestamp '2026-01-01' + i * interval '1 minute'
+        FROM generate_series(1, {USERS}) i""",
+    f"""INSERT INTO post (id, author_id, title, slug, short_id, status, published_at, summary, content_html,
+                          comments_count, likes_count, created_at)
+        SELECT md5('post' || i)::uuid, md5('user' || (i % {USERS} + 1))::uuid, 'Post ' || i, 'post-' || i,
+               left(md5('post' || i), 8), CASE WHEN i % 10 = 0 THEN 'draft' ELSE 'published' END,
+               CASE WHEN i % 10 = 0 THEN NULL ELSE timestamp '2026-01-01' + i * interval '1 minute' END,
+               'Summary of post ' || i, '<p>' || repeat('Lorem ipsum dolor sit amet. ', 20) || '</p>', 0, 0,
+               timestamp '2026-01-01' + i * interval '1 minute'
+        FROM generate_series(1, {POSTS}) i""",
+    f"""INSERT INTO comment (id, post_id, author_id, content, is_moderated, created_at)
+        SELECT md5('comment' || i)::uuid, md5('post' || (i % {POSTS} + 1))::uuid, md5('user' || (i % {USERS} + 1))::uuid,
+               'Comment ' || i, i % 5 <> 0,
+               -- after their post: every 4th in the current month, the rest
+               -- spread over the months before it
+               CASE WHEN i % 4 = 0
+                    THEN {MONTH_START} + (now() AT TIME ZONE 'utc' - {MONTH_START}) * (i::float8 / {COMMENTS})
+                    ELSE p.created_at + ({MONTH_START} - p.created_at) * (i::float8 / {COMMENTS})
+               END
+        FROM generate_series(1, {COMMENTS}) i JOIN post p ON p.id = md5('post' || (i % {POSTS} + 1))::uuid""",
+    f"""INSERT INTO tag (id, name, slug)
+        SELECT md5('tag' || i)::uuid, 'Tag ' || i, 'tag-' || i FROM generate_series(1, {TAGS}) i""",
+    f"""INSERT INTO posttag (post_id, tag_id)
+        SELECT md5('post' || i)::uuid, md5('tag' || (i % {TAGS} + 1))::uuid FROM generate_series(1, {POSTS}) i""",
+    f"""INSERT INTO refreshtoken (id, user_id, session_id, token_hash, expires_at, revoked, created_at)
+        SELECT md5('rt' || i)::uuid, md5('user' || (i % {USERS} + 1))::uuid, md5('session' || i)::uuid,
+               encode(sha256(('rt' || i)::bytea), 'hex'), timestamp '2030-01-01', false, timestamp '2026-01-01'
+        FROM generate_series(1, {REFRESH_TOKENS}) i""",
+    "ANALYZE",
+]
+
+
+def migrate() -> None:
+    proc = subprocess.run(["alembic", "upgrade", "head"], cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise SystemExit(f"alembic upgrade head failed:\n{proc.stderr[-2000:]}")
+
+
+async def seed(reseed: bool) -> None:
+    async with get_engine().connect() as conn:
+        month_comments = (await conn.execute(text(f"SELECT count(*) FROM comment WHERE created_at >= {MONTH_START}"))).scalar()
+    if not reseed and month_comments >= SEED_MONTH_COMMENTS:
+        return
+    print("seeding...")
+    async with get_engine().begin() as conn:
+        await conn.execute(text(TRUNCATE))
+    # the migration's partitions may end before the current month
+    async with async_session() as db:
+        await ensure_partitions(db, get_settings().PARTITION_MONTHS_AHEAD)
+    password_hash = get_password_hash(PASSWORD)
+    async with get_engine().begin() as conn:
+        for statement in SEED:
+            await conn.execute(text(statement), {"password_hash": password_hash})
+
+
+async def table_rows() -> dict[str, float]:
+    async with get_engine().connect() as conn:
+        result = await conn.execute(
+            text("SELECT relname, reltuples FROM pg_class WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace")
+        )
+        return dict(result.all())
+
+
+async def partition_parents() -> dict[str, str]:
+    """Partition and partition index names -> their parent's name."""
+    async with get_engine().connect() as conn:
+        result = await conn.execute(
+            text(
+                "SELECT child.relname, parent.relname FROM pg_inherits "
+                "JOIN pg_class child ON child.oid = inhrelid JOIN pg_class parent ON parent.oid = inhparent"
+            )
+        )
+        return dict(result.all())
+
+
+def fill(value: Any, context: dict[str, str]) -> Any:
+    if isinstance(value, str):
+        return value.format(**context)
+    if isinstance(value, dict):
+        return {key: fill(item, context) for key, item in value.items()}
+    return value
+
+
+def plan_lines(node: dict, parents: dict[str, str], rows: dict[str, float], depth: int = 0) -> list[str]:
+    """Plan shape without costs: node type, index and relation per node."""
+    line = node["Node Type"]
+    if "Index Name" in node:
+        line += f" using {parents.get(node['Index Name'], node['Index Name'])}"
+    if "Relation Name" in node:
+        line += f" on {parents.get(node['Relation Name'], node['Relation Name'])}"
+    children: list[list[str]] = []
+    for child in node.get("Plans", ()):
+        relation = child.get("Relation Name")
+        if relation in parents and rows.get(relation, 0) <= 0:
+            # an empty partition
+            continue
+        child_lines = plan_lines(child, parents, rows, depth + 1)
+        if child_lines not in children:
+            children.append(child_lines)
+    return ["  " * depth + line] + [child_line for lines in children for child_line in lines]
+
+
+def seq_scans(node: dict) -> list[str]:
+    """Relations (partitions by their own name) read with a Seq Scan."""
+    scanned = [node["Relation Name"]] if node["Node Type"] == "Seq Scan" else []
+    for child in node.get("Plans", ()):
+        scanned += seq_scans(child)
+    return scanned
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    context: dict[str, str],
+    parents: dict[str, str],
+    rows: dict[str, float],
+) -> list[dict]:
+    captured: list[tuple[str, Any]] = []
+
+    def capture(conn, cursor, statement, parameters, context_, executemany):
+        captured.append((statement, parameters))
+
+    headers = {"Authorization": f"Bearer {context['access_token']}"} if scenario.auth else {}
+    sync_engine = get_engine().sync_engine
+    event.listen(sync_engine, "before_cursor_execute", capture)
+    try:
+        response = await client.request(
+            scenario.method, fill(scenario.path, context), json=fill(scenario.json, context), headers=headers
+        )
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", capture)
+    if response.status_code != scenario.status:
+        raise SystemExit(f"{scenario.name}: expected {scenario.status}, got {response.status_code}: {response.text[:500]}")
+    if scenario.remember:
+        context.update(response.json())
+
+    queries = []
+    async with get_engine().connect() as conn:
+        for statement, parameters in captured:
+            sql = " ".join(statement.split())
+            if not re.match(r"(SELECT|INSERT|UPDATE|DELETE|WITH)\b", sql, re.IGNORECASE):
+                continue
+            result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+            plan = result.scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            queries.append({"sql": sql, "plan": plan_lines(plan[0]["Plan"], parents, rows), "seq_scans": seq_scans(plan[0]["Plan"])})
+        await conn.rollback()
+    return queries
+
+
+def check(
+    scenario: Scenario,
+    queries: list[dict],
+    snapshot: dict | None,
+    rows: dict[str, float],
+    parents: dict[str, str],
+    threshold: int,
+) -> tuple[list[str], list[str]]:
+    failures, notes = [], []
+    for query in queries:
+        for relation in query["seq_scans"]:
+            table = parents.get(relation, relation)
+            if rows.get(relation, 0) > threshold and table not in scenario.allow_seq_scan:
+                failures.append(f"Seq Scan on {relation} (~{rows[relation]:.0f} rows): {query['sql'][:120]}")
+    if snapshot is None:
+        notes.append("no snapshot yet (run with --update)")
+        return failures, notes
+
+    if len(queries) > snapshot["statements"]:
+        failures.append(f"{len(queries)} statements, snapshot has {snapshot['statements']}")
+    elif len(queries) < snapshot["statements"]:
+        notes.append(f"{len(queries)} statements, snapshot has {snapshot['statements']} (update the snapshot)")
+
+    def indexes(plans: list[dict]) -> set[str]:
+        return {match[1] for query in plans for line in query["plan"] for match in [re.search(r" using (\S+)", line)] if match}
+
+    for lost in sorted(indexes(snapshot["queries"]) - indexes(queries)):
+        failures.append(f"index {lost} is no longer used")
+    if [query["plan"] for query in queries] != [query["plan"] for query in snapshot["queries"]]:
+        notes.append("plan shape changed; review with --update and git diff")
+    return failures, notes
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--update", action="store_true", help="rewrite the snapshots")
+    parser.add_argument("--reseed", action="store_true")
+    parser.add_argument("--seq-scan-rows", type=int, default=1000, help="tables larger than this must not be seq-scanned")
+    args = parser.parse_args()
+
+    migrate()
+    await seed(args.reseed)
+    rows = await table_rows()
+    parents = await partition_parents()
+    async with get_engine().connect() as conn:
+        # the dialect's first-connect queries shouldn't land in a scenario
+        await conn.execute(text("SELECT 1"))
+        post = (await conn.execute(text("SELECT id, short_id FROM post WHERE status = 'published' ORDER BY id LIMIT 1"))).one()
+    context = {"post_id": str(post.id), "short_id": post.short_id, "email": "user1@example.com"}
+
+    SNAPSHOTS.mkdir(exist_ok=True)
+    failed = False
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://plans") as client:
+        for scenario in SCENARIOS:
+            queries = await run_scenario(client, scenario, context, parents, rows)
+            path = SNAPSHOTS / f"{scenario.name}.json"
+            snapshot = json.loads(path.read_text()) if path.exists() else None
+            failures, notes = check(scenario, queries, snapshot, rows, parents, args.seq_scan_rows)
+            if args.update:
+                shapes = [{"sql": query["sql"], "plan": query["plan"]} for query in queries]
+                path.write_text(json.dumps({"statements": len(queries), "queries": shapes}, indent=2) + "\n")
+                notes = [note for note in notes if "snapshot" not in note and "plan shape" not in note]
+            print(f"{'FAIL' if failures else 'ok':>4}  {scenario.name}: {len(queries)} statements")
+            for message in failures:
+                print(f"        {message}")
+            for message in notes:
+                print(f"        note: {message}")
+            failed = failed or bool(failures)
+    await get_engine().dispose()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -6,12 +6,15 @@ from fastapi import Request
 from ..core.db import async_session
 from ..core.security import get_password_hash, verify_password, create_access_token, create_refresh_token, decode_token
 from ..core.utils import get_utc_now
+from ..core.revocation import revocation_list
+from ..services.outbox import enqueue
 from ..models.user import User, UserCreate
 from ..models.refresh_token import RefreshToken
-from ..core.config import settings
+from ..core.config import get_settings
 from sqlmodel import SQLModel
 import hashlib
 from datetime import timedelta
+from uuid import uuid4
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
@@ -40,6 +43,7 @@ async def register(user_in: UserCreate, db: AsyncSession = Depends(get_db)):
         raise HTTPException(status_code=400, detail="Email already registered")
     user = User(email=user_in.email, username=user_in.username, password_hash=get_password_hash(user_in.password))
     db.add(user)
+    enqueue(db, "user.registered", {"user_id": str(user.id)})
     await db.commit()
     await db.refresh(user)
     return {"id": user.id, "email": user.email}
@@ -60,14 +64,15 @@ async def login(form_data: UserCreate, request: Request, db: AsyncSession = Depe
         user.password_hash = get_password_hash(form_data.password)
         db.add(user)
 
-    # create tokens
-    access = create_access_token(str(user.id))
-    refresh = create_refresh_token(str(user.id))
+    # create tokens; every login starts a new session that logout can revoke
+    session_id = uuid4()
+    access = create_access_token(str(user.id), session_id=str(session_id))
+    refresh = create_refresh_token(str(user.id), session_id=str(session_id))
 
     # persist refresh token (store hash only)
     token_hash = hashlib.sha256(refresh.encode()).hexdigest()
-    expires_at = get_utc_now() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    rt = RefreshToken(user_id=user.id, token_hash=token_hash, user_agent=request.headers.get("user-agent"), ip=(request.client.host if request.client else None), expires_at=expires_at)
+    expires_at = get_utc_now() + timedelta(days=get_settings().REFRESH_TOKEN_EXPIRE_DAYS)
+    rt = RefreshToken(user_id=user.id, session_id=session_id, token_hash=token_hash, user_agent=request.headers.get("user-agent"), ip=(request.client.host if request.client else None), expires_at=expires_at)
     db.add(rt)
     await db.commit()
 
@@ -92,16 +97,18 @@ async def refresh_token(payload: RefreshTokenRequest, db: AsyncSession = Depends
     if stored.expires_at and stored.expires_at < get_utc_now():
         raise HTTPException(status_code=401, detail="Refresh token expired")
 
-    # rotate refresh token: revoke old, create new record
+    # rotate refresh token: revoke old, create new record in the same session
+    # (tokens issued before sessions existed are moved into a fresh one)
     stored.revoked = True
-    new_refresh = create_refresh_token(user_id)
+    session_id = stored.session_id or uuid4()
+    new_refresh = create_refresh_token(user_id, session_id=str(session_id))
     new_hash = hashlib.sha256(new_refresh.encode()).hexdigest()
-    expires_at = get_utc_now() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    new_rt = RefreshToken(user_id=stored.user_id, token_hash=new_hash, expires_at=expires_at)
+    expires_at = get_utc_now() + timedelta(days=get_settings().REFRESH_TOKEN_EXPIRE_DAYS)
+    new_rt = RefreshToken(user_id=stored.user_id, session_id=session_id, token_hash=new_hash, expires_at=expires_at)
     db.add(new_rt)
     await db.commit()
 
-    access = create_access_token(user_id)
+    access = create_access_token(user_id, session_id=str(session_id))
     return {"access_token": access, "refresh_token": new_refresh, "token_type": "bearer"}
 
 
@@ -124,7 +131,8 @@ async def logout(payload: LogoutRequest, db: AsyncSession = Depends(get_db)):
         tokens = result.all()
         for token in tokens:
             token.revoked = True
-        await db.commit()
+        # also invalidate outstanding access tokens of every session
+        await revocation_list.revoke(db, user_id, {t.session_id for t in tokens if t.session_id})
         return {"ok": True}
 
     if payload.refresh_token:
@@ -135,7 +143,7 @@ async def logout(payload: LogoutRequest, db: AsyncSession = Depends(get_db)):
         stored = result.one_or_none()
         if stored:
             stored.revoked = True
-            await db.commit()
+            await revocation_list.revoke(db, stored.user_id, [stored.session_id] if stored.session_id else [])
         return {"ok": True}
 
     raise HTTPException(status_code=400, detail="No refresh_token provided to revoke")
@@ -0,0 +1,174 @@
+"""Several API calls in one round trip.
+
+Sub-requests are dispatched in-process to the ASGI app, so they go through
+the same routes, validation and middleware as direct calls, carrying the
+batch request's Authorization header (verified once for the whole batch).
+GET sub-requests share one database session and run one after another on it,
+which takes a single connection from the pool for all of them; other
+sub-requests run concurrently with those, each with its own session.
+Sub-requests are independent: no ordering between them is guaranteed, but
+results are returned in request order.
+"""
+import asyncio
+import json
+import logging
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from fastapi import APIRouter, Header, HTTPException, Request, status
+from sqlmodel import SQLModel, Field
+
+from ..core.config import get_settings
+from ..core.db import shared_session
+from ..core.security import get_current_user_id, verified_authorization
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/batch", tags=["batch"])
+
+METHODS = {"GET", "POST", "PUT", "PATCH", "DELETE"}
+# request headers not passed on to sub-requests (bodies are re-encoded and
+# sub-responses must not be compressed)
+DROPPED_HEADERS = {b"content-length", b"content-type", b"accept-encoding", b"transfer-encoding", b"connection"}
+# preconditions only apply to the item whose `headers` carry them
+CONDITIONAL_HEADERS = {b"if-none-match", b"if-modified-since", b"if-match", b"if-unmodified-since"}
+CONNECTION_KEYS = ("type", "asgi", "http_version", "scheme", "server", "client", "root_path", "state", "extensions")
+# response headers reported per item
+KEPT_HEADERS = {"content-type", "etag", "last-modified", "location"}
+
+
+class BatchItem(SQLModel):
+    method: str = "GET"
+    path: str
+    headers: Dict[str, str] = Field(default_factory=dict)
+    body: Any = None
+
+
+class BatchRequest(SQLModel):
+    requests: List[BatchItem] = Field(min_length=1)
+
+
+def build_scope(request: Request, item: BatchItem) -> tuple[dict, bytes]:
+    url = urlsplit(item.path)
+    headers = [
+        (name, value)
+        for name, value in request.headers.raw
+        if name not in DROPPED_HEADERS and name not in CONDITIONAL_HEADERS
+    ]
+    for name, value in item.headers.items():
+        name = name.lower()
+        # every sub-request runs as the batch's caller
+        if name != "authorization" and name.encode() not in DROPPED_HEADERS:
+            headers.append((name.encode(), value.encode()))
+    body = b""
+    if item.body is not None:
+        body = json.dumps(item.body).encode()
+        headers += [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+
+    # connection-level keys only; routing state is filled in by the app again
+    scope = {key: request.scope[key] for key in CONNECTION_KEYS if key in request.scope}
+    scope.update(
+        method=item.method,
+        path=url.path,
+        raw_path=url.path.encode(),
+        query_string=url.query.encode(),
+        headers=headers,
+    )
+    return scope, body
+
+
+async def dispatch(request: Request, item: BatchItem) -> dict:
+    scope, body = build_scope(request, item)
+    sent = False
+
+    async def receive() -> dict:
+        nonlocal sent
+        if sent:
+            # the app only asks again to watch for a disconnect
+            await asyncio.Event().wait()
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    status_code: Optional[int] = None
+    headers: dict[str, str] = {}
+    chunks: list[bytes] = []
+
+    async def send(message: dict) -> None:
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+            for name, value in message.get("headers", []):
+                name = name.decode().lower()
+                if name in KEPT_HEADERS:
+                    headers[name] = value.decode()
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await request.app(scope, receive, send)
+    except Exception:
+        logger.exception("Batch sub-request %s %s failed", item.method, item.path)
+        if status_code is None or status_code < 500:
+            return {"status": 500, "headers": {}, "body": {"detail": "Internal Server Error"}}
+
+    payload = b"".join(chunks)
+    result: Any = None
+    if payload:
+        if headers.get("content-type", "").startswith("application/json"):
+            result = json.loads(payload)
+        else:
+            result = payload.decode(errors="replace")
+    return {"status": status_code, "headers": headers, "body": result}
+
+
+async def dispatch_reads(request: Request, items: list[BatchItem]) -> list[dict]:
+    if not items:
+        return []
+    results = []
+    async with shared_session() as session:
+        for item in items:
+            result = await dispatch(request, item)
+            if result["status"] >= 500:
+                # a failed statement aborts the shared transaction for the rest
+                await session.rollback()
+            results.append(result)
+    return results
+
+
+@router.post("")
+async def batch(
+    payload: BatchRequest,
+    request: Request,
+    authorization: Optional[str] = Header(None, alias="Authorization"),
+):
+    """Run up to BATCH_MAX_REQUESTS API calls; returns `{"responses": [...]}`
+    in request order, each with its own `status`, `headers` and `body`.
+    """
+    limit = get_settings().BATCH_MAX_REQUESTS
+    if len(payload.requests) > limit:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=f"At most {limit} requests per batch")
+    for item in payload.requests:
+        item.method = item.method.upper()
+        if item.method not in METHODS:
+            raise HTTPException(status_code=400, detail=f"Unsupported method {item.method}")
+        if not item.path.startswith("/") or urlsplit(item.path).path.rstrip("/") == router.prefix:
+            raise HTTPException(status_code=400, detail=f"Invalid path {item.path}")
+
+    # an invalid token fails the batch once instead of every item
+    verified = (authorization, get_current_user_id(authorization)) if authorization else None
+    token = verified_authorization.set(verified)
+    try:
+        reads = [i for i, item in enumerate(payload.requests) if item.method == "GET"]
+        writes = [i for i, item in enumerate(payload.requests) if item.method != "GET"]
+        read_results, *write_results = await asyncio.gather(
+            dispatch_reads(request, [payload.requests[i] for i in reads]),
+            *(dispatch(request, payload.requests[i]) for i in writes),
+        )
+    finally:
+        verified_authorization.reset(token)
+    responses: list[Optional[dict]] = [None] * len(payload.requests)
+    for i, result in zip(reads, read_results):
+        responses[i] = result
+    for i, result in zip(writes, write_results):
+        responses[i] = result
+    return {"responses": responses}
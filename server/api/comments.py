@@ -1,8 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from sqlalchemy import tuple_
+from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from ..core.db import async_session
-from ..models.comment import Comment
+from ..core.security import get_current_user_id
+from ..models.comment import Comment, CommentCreate
+from ..models.post import Post
+from ..services.moderation import Verdict, prescreen
+from ..services.outbox import enqueue
+from ..services.partitions import since_post
+from ..services.trending import Activity, get_scorer
 
 router = APIRouter(prefix="/api/posts/{post_id}/comments", tags=["comments"])
 
@@ -12,10 +23,68 @@ async def get_db():
         yield session
 
 
-@router.post("/", status_code=status.HTTP_201_CREATED)
-async def add_comment(post_id: str, payload: Comment, db: AsyncSession = Depends(get_db)):
-    payload.post_id = post_id
-    db.add(payload)
+@router.get("/", response_model=List[Comment])
+async def list_comments(
+    post_id: UUID,
+    after: Optional[UUID] = Query(None, description="id of the last comment already loaded"),
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+):
+    """Approved comments of a post, oldest first."""
+    # `Comment.is_moderated` alone matches the ix_comment_approved predicate
+    q = select(Comment).where(Comment.post_id == post_id, Comment.is_moderated, since_post(Comment.created_at, post_id))
+    if after is not None:
+        last = select(Comment.created_at).where(Comment.id == after).scalar_subquery()
+        # (created_at, id): comments sharing the last timestamp stay on the next
+        # page; the plain bound is what prunes the partitions before it
+        q = q.where(tuple_(Comment.created_at, Comment.id) > tuple_(last, after), Comment.created_at >= last)
+    result = await db.exec(q.order_by(Comment.created_at, Comment.id).limit(limit))
+    return result.all()
+
+
+@router.post("/", status_code=status.HTTP_201_CREATED, response_model=Comment)
+async def add_comment(
+    post_id: UUID,
+    payload: CommentCreate,
+    db: AsyncSession = Depends(get_db),
+    authorization: str = Header(..., alias="Authorization"),
+):
+    """Add a comment as the authenticated user.
+
+    It is screened first: rejected comments are refused with 400, held ones
+    are stored but stay hidden until approved (`is_moderated` is false).
+    """
+    current_user_id = get_current_user_id(authorization)
+    result = await db.exec(select(Post.id).where(Post.id == post_id, Post.status == "published"))
+    if result.one_or_none() is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+    if payload.parent_id is not None:
+        q = select(Comment.id).where(
+            Comment.id == payload.parent_id,
+            Comment.post_id == post_id,
+            Comment.is_moderated,
+            since_post(Comment.created_at, post_id),
+        )
+        result = await db.exec(q)
+        if result.one_or_none() is None:
+            raise HTTPException(status_code=400, detail="Parent comment not found")
+
+    verdict = await prescreen(payload.content)
+    if verdict == Verdict.reject:
+        raise HTTPException(status_code=400, detail="Comment rejected by moderation rules")
+
+    comment = Comment(
+        post_id=post_id,
+        author_id=UUID(current_user_id),
+        parent_id=payload.parent_id,
+        content=payload.content,
+        is_moderated=verdict == Verdict.approve,
+    )
+    db.add(comment)
+    if comment.is_moderated:
+        enqueue(db, "comment.added", {"post_id": str(post_id), "comment_id": str(comment.id)})
     await db.commit()
-    await db.refresh(payload)
-    return payload
+    await db.refresh(comment)
+    if comment.is_moderated:
+        get_scorer().record(comment.post_id, Activity.comment, comment.created_at)
+    return comment
@@ -0,0 +1,122 @@
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..core.config import get_settings
+from ..core.db import async_session
+from ..core.http_cache import conditional_response, conditional_stream
+from ..models.tag import Tag
+from ..models.user import User
+from ..services.feeds import (
+    EPOCH,
+    cache_key,
+    feed_modified_at,
+    get_sitemap_shards,
+    load_feed,
+    render_atom,
+    render_rss,
+    render_sitemap_index,
+    shard_version,
+    stream_shard,
+)
+
+router = APIRouter(tags=["feeds"])
+
+
+async def get_db():
+    async with async_session() as session:
+        yield session
+
+
+async def feed_response(
+    request: Request, db: AsyncSession, author: Optional[str], tag: Optional[str], atom: bool
+) -> Response:
+    settings = get_settings()
+    title = settings.SITE_TITLE
+    author_id = tag_id = None
+    if author is not None:
+        result = await db.exec(select(User).where(User.username == author))
+        user = result.one_or_none()
+        if not user:
+            raise HTTPException(status_code=404, detail="Author not found")
+        author_id = user.id
+        title = f"{title}: {user.display_name or user.username}"
+    if tag is not None:
+        result = await db.exec(select(Tag).where(Tag.slug == tag))
+        found = result.first()
+        if not found:
+            raise HTTPException(status_code=404, detail="Tag not found")
+        tag_id = found.id
+        title = f"{title}: #{found.name}"
+
+    entries = await load_feed(db, settings.FEED_SIZE, author_id, tag_id)
+    self_url = str(request.url)
+    # the listed posts and their versions identify the document
+    key = cache_key("atom" if atom else "rss", self_url, title, *(f"{e.id}@{e.changed_at}" for e in entries))
+    render = render_atom if atom else render_rss
+    return conditional_response(
+        request,
+        f"feed-{key}",
+        feed_modified_at(entries),
+        lambda: render(title, self_url, entries),
+        media_type="application/atom+xml" if atom else "application/rss+xml",
+    )
+
+
+@router.get("/feed.xml")
+async def rss_feed(
+    request: Request,
+    author: Optional[str] = Query(None, description="username"),
+    tag: Optional[str] = Query(None, description="tag slug"),
+    db: AsyncSession = Depends(get_db),
+):
+    """Latest published posts as RSS 2.0, optionally for one author and/or tag."""
+    return await feed_response(request, db, author, tag, atom=False)
+
+
+@router.get("/atom.xml")
+async def atom_feed(
+    request: Request,
+    author: Optional[str] = Query(None, description="username"),
+    tag: Optional[str] = Query(None, description="tag slug"),
+    db: AsyncSession = Depends(get_db),
+):
+    """Same as /feed.xml, as Atom 1.0."""
+    return await feed_response(request, db, author, tag, atom=True)
+
+
+@router.get("/sitemap.xml")
+async def sitemap_index(request: Request, db: AsyncSession = Depends(get_db)):
+    """Sitemap index pointing at one shard per SITEMAP_SHARD_SIZE published posts."""
+    settings = get_settings()
+    shards = await get_sitemap_shards().get(db)
+    base_url = str(request.base_url)
+    key = cache_key(base_url, *(f"{s.first_id}@{s.changed_at}/{s.urls}" for s in shards))
+    return conditional_response(
+        request,
+        f"sitemap-{key}",
+        max((s.changed_at for s in shards), default=EPOCH),
+        lambda: render_sitemap_index(shards, lambda first_id: str(request.url_for("sitemap_shard", first_id=first_id))),
+        media_type="application/xml",
+        cache_control=f"public, max-age={settings.SITEMAP_CACHE_SECONDS}",
+    )
+
+
+@router.get("/sitemaps/posts-{first_id}.xml")
+async def sitemap_shard(first_id: UUID, request: Request, db: AsyncSession = Depends(get_db)):
+    """Up to SITEMAP_SHARD_SIZE post URLs starting at `first_id`, streamed."""
+    settings = get_settings()
+    urls, changed_at = await shard_version(db, first_id, settings.SITEMAP_SHARD_SIZE)
+    if urls == 0:
+        raise HTTPException(status_code=404, detail="Sitemap not found")
+    return conditional_stream(
+        request,
+        f"sitemap-{first_id}-{urls}",
+        changed_at,
+        lambda: stream_shard(first_id, settings.SITEMAP_SHARD_SIZE),
+        media_type="application/xml",
+        cache_control=f"public, max-age={settings.SITEMAP_CACHE_SECONDS}",
+    )
@@ -0,0 +1,55 @@
+from typing import List, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from sqlmodel import SQLModel, Field, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..core.db import async_session
+from ..core.security import get_current_user_id
+from ..models.comment import Comment
+from ..models.user import User
+from ..services.moderation import approve_comments, pending_comments, reject_comments
+
+router = APIRouter(prefix="/api/moderation", tags=["moderation"])
+
+
+class CommentIds(SQLModel):
+    ids: List[UUID] = Field(min_length=1, max_length=1000)
+
+
+async def get_db():
+    async with async_session() as session:
+        yield session
+
+
+async def require_admin(
+    authorization: str = Header(..., alias="Authorization"), db: AsyncSession = Depends(get_db)
+) -> UUID:
+    current_user_id = get_current_user_id(authorization)
+    result = await db.exec(select(User.is_admin).where(User.id == UUID(current_user_id)))
+    if not result.one_or_none():
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Moderators only")
+    return UUID(current_user_id)
+
+
+@router.get("/comments", response_model=List[Comment], dependencies=[Depends(require_admin)])
+async def moderation_queue(
+    after: Optional[UUID] = Query(None, description="id of the last comment of the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db),
+):
+    """Comments awaiting review, oldest first."""
+    return await pending_comments(db, limit, after)
+
+
+@router.post("/comments/approve", dependencies=[Depends(require_admin)])
+async def approve(payload: CommentIds, db: AsyncSession = Depends(get_db)):
+    """Publish the given pending comments; ids that aren't pending are ignored."""
+    return {"approved": await approve_comments(db, payload.ids)}
+
+
+@router.post("/comments/reject", dependencies=[Depends(require_admin)])
+async def reject(payload: CommentIds, db: AsyncSession = Depends(get_db)):
+    """Delete the given pending comments; ids that aren't pending are ignored."""
+    return {"rejected": await reject_comments(db, payload.ids)}
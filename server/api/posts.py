@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Header
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response, status, Header
+from fastapi.responses import JSONResponse
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel import SQLModel, select
 from typing import Any, List, Optional
@@ -9,9 +10,15 @@ from sqlalchemy import String, or_
 from enum import Enum
 
 from ..core.db import async_session
+from ..core.http_cache import conditional_response, entity_tag
 from ..core.security import get_current_user_id
 from ..core.utils import get_utc_now
 from ..models.post import Post
+from ..models.trending import TrendingPost
+from ..services.autosave import get_autosaver
+from ..services.outbox import enqueue
+from ..services.revisions import list_revisions, load_revision, post_fields, record_revision
+from ..services.views import get_view_counter, post_view_stats, visitor_key
 
 router = APIRouter(prefix="/api/posts", tags=["posts"])
 
@@ -70,6 +77,7 @@ class PostUpdate(SQLModel):
     published_at: datetime | str | None = None
     summary: str | None = None
     content_html: str | None = None
+    content_json: dict[str, Any] | None = None
 
 
 async def get_db():
@@ -77,6 +85,25 @@ async def get_db():
         yield session
 
 
+def post_response(request: Request, post: Post) -> Response:
+    """Serve a single post with ETag/Last-Modified and a cached encoded body.
+
+    Also counts the view (in memory; see `services.views`) when the body is
+    sent; 304 revalidations are not views.
+    """
+    response = conditional_response(
+        request,
+        post.id,
+        post.updated_at or post.created_at,
+        lambda: post.model_dump_json().encode(),
+        # the outbox handlers update the counters without touching updated_at
+        variant=f"{post.comments_count}.{post.likes_count}",
+    )
+    if response.status_code != 304:
+        get_view_counter().record(post.id, visitor_key(request))
+    return response
+
+
 @router.get("/", response_model=List[Post])
 async def list_posts(
     db: AsyncSession = Depends(get_db),
@@ -152,23 +179,42 @@ async def create_post(
     )
 
     db.add(post)
+    enqueue(db, "post.created", {"post_id": str(post.id), "author_id": str(post.author_id)})
     await db.commit()
     await db.refresh(post)
     return post
 
 
+@router.get("/trending", response_model=List[Post])
+async def trending_posts(limit: int = Query(20, ge=1, le=100), db: AsyncSession = Depends(get_db)):
+    """Published posts ranked by time-decayed likes, comments and bookmarks.
+
+    Reads the ranking materialized by `services.trending`; nothing is
+    aggregated per request.
+    """
+    q = (
+        select(Post)
+        .join(TrendingPost, TrendingPost.post_id == Post.id)
+        .where(Post.status == PostStatus.published.value)
+        .order_by(TrendingPost.rank)
+        .limit(limit)
+    )
+    result = await db.exec(q)
+    return result.all()
+
+
 @router.get("/{post_id}", response_model=Post)
-async def get_post(post_id: str, db: AsyncSession = Depends(get_db)):
+async def get_post(post_id: str, request: Request, db: AsyncSession = Depends(get_db)):
     q = select(Post).where(Post.id == post_id)
     result = await db.exec(q)
     post = result.one_or_none()
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
-    return post
+    return post_response(request, post)
 
 
 @router.get("/short/{short_id}", response_model=Post)
-async def get_post_by_short(short_id: str, db: AsyncSession = Depends(get_db)):
+async def get_post_by_short(short_id: str, request: Request, db: AsyncSession = Depends(get_db)):
     """Lookup post by a short prefix of the UUID (e.g. first 8 chars).
 
     Returns 404 when not found and 409 if the short id is ambiguous.
@@ -189,7 +235,7 @@ async def get_post_by_short(short_id: str, db: AsyncSession = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Post not found")
     if len(matches) > 1:
         raise HTTPException(status_code=409, detail="Short id ambiguous")
-    return matches[0]
+    return post_response(request, matches[0])
 
 
 @router.put("/{post_id}", response_model=Post)
@@ -205,7 +251,8 @@ async def update_post(
     """
     current_user_id = get_current_user_id(authorization)
     
-    q = select(Post).where(Post.id == post_id)
+    # lock the row so concurrent edits get consecutive revision numbers
+    q = select(Post).where(Post.id == post_id).with_for_update()
     result = await db.exec(q)
     post = result.one_or_none()
     if not post:
@@ -217,6 +264,7 @@ async def update_post(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You can only update your own posts"
         )
+    before = post_fields(post)
 
     updates = payload.model_dump(exclude_unset=True)
     if "published_at" in updates:
@@ -236,6 +284,89 @@ async def update_post(
 
     post.updated_at = get_utc_now()
     db.add(post)
+    await record_revision(db, post.id, post.author_id, before, post_fields(post))
+    enqueue(db, "post.updated", {"post_id": str(post.id), "fields": sorted(updates)})
     await db.commit()
     await db.refresh(post)
+    get_autosaver().forget(post.id)
     return post
+
+
+async def get_own_post_id(db: AsyncSession, post_id: str, authorization: str, action: str = "view revisions") -> UUID:
+    """Resolve `post_id` for an author-only endpoint (404/403 otherwise)."""
+    current_user_id = get_current_user_id(authorization)
+    try:
+        post_uuid = UUID(post_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Post not found")
+    result = await db.exec(select(Post.author_id).where(Post.id == post_uuid))
+    author_id = result.one_or_none()
+    if author_id is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+    if str(author_id) != current_user_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=f"Only the author can {action}")
+    return post_uuid
+
+
+@router.get("/{post_id}/stats")
+async def get_post_stats(
+    post_id: str,
+    days: int = Query(30, ge=1, le=366),
+    db: AsyncSession = Depends(get_db),
+    authorization: str = Header(..., alias="Authorization"),
+):
+    """Views and estimated unique visitors per day for the last `days` days. Author only."""
+    post_uuid = await get_own_post_id(db, post_id, authorization, action="view stats")
+    return await post_view_stats(db, post_uuid, days)
+
+
+@router.get("/{post_id}/revisions")
+async def get_post_revisions(
+    post_id: str,
+    db: AsyncSession = Depends(get_db),
+    authorization: str = Header(..., alias="Authorization"),
+):
+    """List revisions of a post, newest first (metadata only). Author only."""
+    post_uuid = await get_own_post_id(db, post_id, authorization)
+    return await list_revisions(db, post_uuid)
+
+
+@router.get("/{post_id}/revisions/{number}")
+async def get_post_revision(
+    post_id: str,
+    number: int,
+    db: AsyncSession = Depends(get_db),
+    authorization: str = Header(..., alias="Authorization"),
+):
+    """Title, summary and content of a post as of revision `number`. Author only."""
+    post_uuid = await get_own_post_id(db, post_id, authorization)
+    revision = await load_revision(db, post_uuid, number)
+    if revision is None:
+        raise HTTPException(status_code=404, detail="Revision not found")
+    return revision
+
+
+@router.patch("/{post_id}/content")
+async def patch_post_content(
+    post_id: str,
+    operations: List[dict[str, Any]] = Body(..., media_type="application/json-patch+json"),
+    if_match: Optional[str] = Header(None, alias="If-Match"),
+    authorization: str = Header(..., alias="Authorization"),
+):
+    """Apply an RFC 6902 JSON Patch to `content_json` (editor autosave).
+
+    Only the post author may patch. Send the ETag from the last read or save
+    as If-Match to get 412 instead of overwriting someone else's changes.
+    Returns the new version and its ETag, not the document.
+    """
+    current_user_id = get_current_user_id(authorization)
+    try:
+        post_uuid = UUID(post_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Post not found")
+
+    version = await get_autosaver().apply(post_uuid, current_user_id, if_match, operations)
+    return JSONResponse(
+        {"id": str(post_uuid), "updated_at": version.isoformat()},
+        headers={"ETag": f'"{entity_tag(post_uuid, version)}"'},
+    )
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -5,10 +7,74 @@ class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
     DATABASE_URL: str
+    # connections kept per worker process (and opened at startup)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    # pre-open connections and prime statement/crypto caches before serving
+    WARMUP_ON_STARTUP: bool = True
+    # a worker whose warm-up fails or exceeds this stays not-ready and retries
+    WARMUP_TIMEOUT_SECONDS: float = 30.0
     JWT_SECRET: str
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    # how often each worker pulls revoked session ids from the database
+    REVOCATION_SYNC_SECONDS: float = 5.0
+    # responses smaller than this are sent uncompressed
+    COMPRESSION_MIN_SIZE: int = 1024
+    # memory budget for rendered/compressed post bodies (core.http_cache)
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    # trending feed (services.trending); changing the half-life requires
+    # `python -m server.services.trending --rebuild`
+    TRENDING_HALF_LIFE_HOURS: float = 24.0
+    TRENDING_FLUSH_SECONDS: float = 10.0
+    TRENDING_REFRESH_SECONDS: float = 60.0
+    TRENDING_SIZE: int = 100
+    # content_json patches for the same post arriving within this window are
+    # written with a single UPDATE (services.autosave)
+    AUTOSAVE_COALESCE_SECONDS: float = 0.5
+    # a full revision snapshot is stored every N revisions; rebuilding a
+    # revision applies at most N - 1 deltas (services.revisions)
+    REVISION_SNAPSHOT_EVERY: int = 25
+    # views are counted in memory and written this often; a crash loses at
+    # most one interval (services.views)
+    VIEW_FLUSH_SECONDS: float = 30.0
+    # transactional outbox (services.outbox); set OUTBOX_IN_PROCESS=false when
+    # running `python -m server.services.outbox` as separate processes
+    OUTBOX_IN_PROCESS: bool = True
+    OUTBOX_POLL_SECONDS: float = 1.0
+    OUTBOX_BATCH_SIZE: int = 100
+    # handlers of a batch run at most this many at a time, each with its own
+    # DB connection; keep it well below DB_POOL_SIZE when running in-process
+    OUTBOX_CONCURRENCY: int = 2
+    OUTBOX_MAX_ATTEMPTS: int = 8
+    # a claimed event is retried by another runner if not finished within this
+    OUTBOX_LEASE_SECONDS: float = 60.0
+    # public site (the client app) that post links in feeds and sitemaps point to
+    SITE_URL: str = "http://localhost:3000"
+    SITE_TITLE: str = "Blogging Platform"
+    FEED_SIZE: int = 50
+    # URLs per sitemap file (the protocol allows at most 50,000)
+    SITEMAP_SHARD_SIZE: int = 50_000
+    # how long the sitemap shard list is reused and shared caches may keep it
+    SITEMAP_CACHE_SECONDS: int = 300
+    # comment pre-screening (services.moderation): keywords, or regexes
+    # prefixed with "re:"; comments no rule decides on are held for review
+    # unless MODERATION_AUTO_APPROVE is set
+    MODERATION_REJECT_RULES: list[str] = []
+    MODERATION_HOLD_RULES: list[str] = []
+    MODERATION_AUTO_APPROVE: bool = False
+    # most sub-requests accepted by POST /api/batch
+    BATCH_MAX_REQUESTS: int = 20
+    # monthly comment/postlike partitions are created this many months ahead,
+    # checked this often (services.partitions)
+    PARTITION_MONTHS_AHEAD: int = 3
+    PARTITION_CHECK_SECONDS: float = 6 * 3600.0
 
 
-settings = Settings()
+@lru_cache
+def get_settings() -> Settings:
+    """Build settings on first use so importing server modules (Alembic, CLI
+    tools, benchmarks) neither reads `.env` nor requires the variables.
+    """
+    return Settings()
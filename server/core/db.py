@@ -1,12 +1,74 @@
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import AsyncIterator
+
 from sqlmodel import SQLModel
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine
 from sqlalchemy.orm import sessionmaker
 
-from ..core.config import settings
+from ..core.config import get_settings
+
+
+@lru_cache
+def get_engine() -> AsyncEngine:
+    """Create the engine on first use; this also imports the asyncpg dialect."""
+    settings = get_settings()
+    return create_async_engine(
+        settings.DATABASE_URL,
+        echo=False,
+        future=True,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+    )
+
+
+@lru_cache
+def get_sessionmaker() -> sessionmaker:
+    return sessionmaker(get_engine(), class_=AsyncSession, expire_on_commit=False)
+
+
+# set by `shared_session`; `async_session` then lends this session out
+_shared_session: ContextVar[AsyncSession | None] = ContextVar("shared_session", default=None)
+
+
+class _Borrowed:
+    """`async with` wrapper that leaves the shared session open on exit."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def __aenter__(self) -> AsyncSession:
+        return self.session
+
+    async def __aexit__(self, *exc) -> None:
+        pass
+
+
+def async_session() -> AsyncSession:
+    shared = _shared_session.get()
+    if shared is not None:
+        return _Borrowed(shared)
+    return get_sessionmaker()()
+
+
+@asynccontextmanager
+async def shared_session() -> AsyncIterator[AsyncSession]:
+    """Make every `async_session()` in this context reuse one session.
+
+    Only for code that runs its queries one after another and doesn't
+    commit (read-only handlers); an AsyncSession must not be used
+    concurrently. After a failed statement the caller must roll the session
+    back before the next handler uses it.
+    """
+    async with get_sessionmaker()() as session:
+        token = _shared_session.set(session)
+        try:
+            yield session
+        finally:
+            _shared_session.reset(token)
 
-engine: AsyncEngine = create_async_engine(settings.DATABASE_URL, echo=False, future=True)
-async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 # convenience import for Alembic autogenerate
 metadata = SQLModel.metadata
@@ -0,0 +1,217 @@
+"""Conditional GET and pre-compressed bodies for large, cacheable responses.
+
+Post reads return `content_html` plus `content_json` and are often hundreds of
+KB. Instead of re-serializing and re-compressing on every hit, the rendered
+body and each negotiated encoding are kept in a byte-bounded LRU keyed by the
+entity tag, which changes whenever the post's `updated_at` or counters do.
+Clients and CDNs that already hold the current version get a bodyless 304.
+
+brotli and zstandard are optional; without them only gzip is offered.
+"""
+import gzip
+from collections import OrderedDict
+from functools import lru_cache
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import AsyncIterator, Callable
+
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+
+from .config import get_settings
+
+try:
+    import brotli
+except ImportError:  # optional: pip install brotli
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional: pip install zstandard
+    zstandard = None
+
+
+# Preferred encodings first; used when the client accepts several equally.
+ENCODERS: dict[str, Callable[[bytes], bytes]] = {}
+if brotli is not None:
+    ENCODERS["br"] = lambda data: brotli.compress(data, quality=5)
+if zstandard is not None:
+    ENCODERS["zstd"] = lambda data: zstandard.ZstdCompressor(level=6).compress(data)
+ENCODERS["gzip"] = lambda data: gzip.compress(data, compresslevel=6)
+
+IDENTITY = "identity"
+
+
+def negotiate_encoding(accept_encoding: str | None) -> str:
+    """Pick the best supported content-coding for an Accept-Encoding header."""
+    if not accept_encoding:
+        return IDENTITY
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+
+    best, best_q = IDENTITY, 0.0
+    for name in ENCODERS:
+        q = accepted.get(name, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+class EncodedBodyCache:
+    """LRU of rendered bodies and their encodings, bounded by total bytes."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple[str, str], bytes] = OrderedDict()
+        self._size = 0
+
+    def get(self, etag: str, encoding: str, render: Callable[[], bytes]) -> bytes:
+        key = (etag, encoding)
+        body = self._entries.get(key)
+        if body is not None:
+            self._entries.move_to_end(key)
+            return body
+
+        if encoding == IDENTITY:
+            body = render()
+        else:
+            body = ENCODERS[encoding](self.get(etag, IDENTITY, render))
+        self._put(key, body)
+        return body
+
+    def _put(self, key: tuple[str, str], body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        self._entries[key] = body
+        self._size += len(body)
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._size = 0
+
+
+@lru_cache
+def get_body_cache() -> EncodedBodyCache:
+    return EncodedBodyCache(get_settings().RESPONSE_CACHE_MAX_BYTES)
+
+
+def entity_tag(resource_id: object, modified_at: datetime, variant: str = "") -> str:
+    """Strong validator for a resource version (without the quotes).
+
+    `variant` covers fields that change without `modified_at` (e.g. counters).
+    """
+    tag = f"{resource_id}-{int(_as_utc(modified_at).timestamp() * 1_000_000):x}"
+    return f"{tag}.{variant}" if variant else tag
+
+
+def _as_utc(value: datetime) -> datetime:
+    # database timestamps are naive UTC (see core.utils.get_utc_now)
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def etag_matches(header: str, etag: str, ignore_variant: bool = False) -> bool:
+    """True when an If-Match/If-None-Match header lists `etag` (or is `*`).
+
+    With `ignore_variant`, tags only need the same resource and version.
+    """
+    if header.strip() == "*":
+        return True
+    for tag in header.split(","):
+        tag = tag.strip().removeprefix("W/").strip('"')
+        # encoded representations carry a "-<coding>" suffix
+        base, _, coding = tag.rpartition("-")
+        if coding in ENCODERS:
+            tag = base
+        if ignore_variant:
+            tag = tag.partition(".")[0]
+        if tag == etag:
+            return True
+    return False
+
+
+def is_not_modified(request: Request, etag: str, modified_at: datetime) -> bool:
+    """Evaluate If-None-Match / If-Modified-Since against the current version."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return _as_utc(modified_at).replace(microsecond=0) <= _as_utc(since)
+    return False
+
+
+def _validator_headers(modified_at: datetime, cache_control: str) -> dict[str, str]:
+    return {
+        "Last-Modified": format_datetime(_as_utc(modified_at).replace(microsecond=0), usegmt=True),
+        "Cache-Control": cache_control,
+        "Vary": "Accept-Encoding",
+    }
+
+
+def conditional_response(
+    request: Request,
+    resource_id: object,
+    modified_at: datetime,
+    render: Callable[[], bytes],
+    media_type: str = "application/json",
+    cache_control: str = "no-cache",
+    variant: str = "",
+) -> Response:
+    """Build a cacheable response, answering 304 when the client is current.
+
+    `render` is only called on a cache miss for this version.
+    """
+    etag = entity_tag(resource_id, modified_at, variant)
+    headers = _validator_headers(modified_at, cache_control)
+    if is_not_modified(request, etag, modified_at):
+        headers["ETag"] = f'"{etag}"'
+        return Response(status_code=304, headers=headers)
+
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    body_cache = get_body_cache()
+    body = body_cache.get(etag, IDENTITY, render)
+    if encoding != IDENTITY and len(body) >= get_settings().COMPRESSION_MIN_SIZE:
+        body = body_cache.get(etag, encoding, render)
+        headers["Content-Encoding"] = encoding
+        headers["ETag"] = f'"{etag}-{encoding}"'
+    else:
+        headers["ETag"] = f'"{etag}"'
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+def conditional_stream(
+    request: Request,
+    resource_id: object,
+    modified_at: datetime,
+    stream: Callable[[], AsyncIterator[bytes]],
+    media_type: str,
+    cache_control: str = "no-cache",
+) -> Response:
+    """Like `conditional_response` for bodies too large to cache or buffer.
+
+    The body is sent as `stream()` produces it (GZipMiddleware compresses it
+    on the fly); `stream` is not called when answering 304.
+    """
+    etag = entity_tag(resource_id, modified_at)
+    headers = _validator_headers(modified_at, cache_control)
+    headers["ETag"] = f'"{etag}"'
+    if is_not_modified(request, etag, modified_at):
+        return Response(status_code=304, headers=headers)
+    return StreamingResponse(stream(), media_type=media_type, headers=headers)
@@ -0,0 +1,143 @@
+"""HyperLogLog cardinality sketch for unique-visitor estimates.
+
+A sketch with precision p keeps 2**p one-byte registers (4 KB at the default
+p=12) and estimates the number of distinct items added with a standard error
+of about 1.04 / sqrt(2**p), roughly 1.6%. Sketches of the same precision merge
+by taking the register-wise maximum, so per-worker sketches can be combined
+with the stored one and daily sketches can be combined into a range.
+
+A new sketch starts sparse: only the non-zero registers, as a sorted array of
+`index << 6 | rank` entries (4 bytes each), which gives the same estimates as
+the dense registers. It switches to the dense registers once more than
+m / SPARSE_FRACTION registers are set, i.e. at half the dense size. Most
+buffered (post, day) sketches see a handful of visitors, so they stay at a few
+bytes instead of 4 KB. `to_bytes` always writes the dense form.
+"""
+import hashlib
+import math
+from array import array
+from bisect import bisect_left
+
+DEFAULT_PRECISION = 12
+SPARSE_FRACTION = 8
+RANK_BITS = 6
+
+
+def _hash64(item: str) -> int:
+    return int.from_bytes(hashlib.blake2b(item.encode(), digest_size=8).digest(), "big")
+
+
+class HyperLogLog:
+    __slots__ = ("p", "registers", "_sparse")
+
+    def __init__(self, p: int = DEFAULT_PRECISION, registers: bytes | None = None) -> None:
+        self.p = p
+        m = 1 << p
+        if registers is not None and len(registers) != m:
+            raise ValueError(f"expected {m} registers, got {len(registers)}")
+        # exactly one of the two is set
+        self.registers = bytearray(registers) if registers is not None else None
+        self._sparse = array("I") if registers is None else None
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HyperLogLog":
+        return cls(int(math.log2(len(data))), data)
+
+    def to_bytes(self) -> bytes:
+        if self.registers is None:
+            return bytes(self._densify())
+        return bytes(self.registers)
+
+    def add(self, item: str) -> None:
+        x = _hash64(item)
+        index = x >> (64 - self.p)
+        rest = x & ((1 << (64 - self.p)) - 1)
+        # position of the leftmost 1-bit in the remaining 64 - p bits
+        rank = (64 - self.p) - rest.bit_length() + 1
+        self._update(index, rank)
+
+    def _update(self, index: int, rank: int) -> None:
+        if self.registers is not None:
+            if rank > self.registers[index]:
+                self.registers[index] = rank
+            return
+        sparse = self._sparse
+        pos = bisect_left(sparse, index << RANK_BITS)
+        if pos < len(sparse) and sparse[pos] >> RANK_BITS == index:
+            if rank > sparse[pos] & ((1 << RANK_BITS) - 1):
+                sparse[pos] = index << RANK_BITS | rank
+            return
+        sparse.insert(pos, index << RANK_BITS | rank)
+        if len(sparse) > (1 << self.p) // SPARSE_FRACTION:
+            self.registers = self._densify()
+            self._sparse = None
+
+    def _densify(self) -> bytearray:
+        registers = bytearray(1 << self.p)
+        mask = (1 << RANK_BITS) - 1
+        for entry in self._sparse:
+            registers[entry >> RANK_BITS] = entry & mask
+        return registers
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.p != self.p:
+            raise ValueError("cannot merge sketches of different precision")
+        if other.registers is None:
+            mask = (1 << RANK_BITS) - 1
+            for entry in other._sparse:
+                self._update(entry >> RANK_BITS, entry & mask)
+            return
+        if self.registers is None:
+            self.registers = self._densify()
+            self._sparse = None
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def count(self) -> int:
+        """Estimate with Ertl's improved raw estimator ("New cardinality
+        estimation algorithms for HyperLogLog sketches", 2017), which stays
+        unbiased across the small/large range switch that the classic
+        estimator needs empirical bias tables for.
+        """
+        m = 1 << self.p
+        q = 64 - self.p
+        histogram = [0] * (q + 2)
+        if self.registers is None:
+            histogram[0] = m - len(self._sparse)
+            for entry in self._sparse:
+                histogram[entry & ((1 << RANK_BITS) - 1)] += 1
+        else:
+            for r in self.registers:
+                histogram[r] += 1
+        if histogram[0] == m:
+            return 0
+        z = m * _tau(1 - histogram[q + 1] / m)
+        for k in range(q, 0, -1):
+            z = 0.5 * (z + histogram[k])
+        z += m * _sigma(histogram[0] / m)
+        return round(m * m / (2 * math.log(2)) / z)
+
+
+def _sigma(x: float) -> float:
+    if x == 1.0:
+        return math.inf
+    y, z = 1.0, x
+    while True:
+        x *= x
+        previous = z
+        z += x * y
+        y += y
+        if z == previous:
+            return z
+
+
+def _tau(x: float) -> float:
+    if x == 0.0 or x == 1.0:
+        return 0.0
+    y, z = 1.0, 1.0 - x
+    while True:
+        x = math.sqrt(x)
+        previous = z
+        y *= 0.5
+        z -= (1 - x) ** 2 * y
+        if z == previous:
+            return z / 3
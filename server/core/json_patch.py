@@ -0,0 +1,159 @@
+"""Minimal RFC 6902 JSON Patch / RFC 6901 JSON Pointer implementation.
+
+`apply_patch` never mutates its input. Each operation copies only the
+containers on the path it touches and shares every other subtree with the
+previous document, so patching a large `content_json` costs O(depth) rather
+than a deep copy of the whole document.
+"""
+from typing import Any, Callable
+
+
+class JsonPatchError(ValueError):
+    """The patch is malformed or does not apply to the document."""
+
+
+class JsonPatchTestFailed(JsonPatchError):
+    """A `test` operation did not match."""
+
+
+def parse_pointer(pointer: str) -> list[str]:
+    if not isinstance(pointer, str):
+        raise JsonPatchError(f"JSON pointer must be a string, not {type(pointer).__name__}")
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise JsonPatchError(f"Invalid JSON pointer: {pointer!r}")
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def _index(container: list, token: str, allow_end: bool = False) -> int:
+    if allow_end and token == "-":
+        return len(container)
+    if not token.isdigit() or (token != "0" and token.startswith("0")):
+        raise JsonPatchError(f"Invalid array index: {token!r}")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise JsonPatchError(f"Array index out of range: {index}")
+    return index
+
+
+def resolve(doc: Any, tokens: list[str]) -> Any:
+    node = doc
+    for token in tokens:
+        if isinstance(node, dict):
+            if token not in node:
+                raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+            node = node[token]
+        elif isinstance(node, list):
+            node = node[_index(node, token)]
+        else:
+            raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+    return node
+
+
+def _modify(node: Any, tokens: list[str], change: Callable[[Any, str], None]) -> Any:
+    """Return a copy of `node` with `change(parent, last_token)` applied, cloning
+    only the containers along `tokens`.
+    """
+    if isinstance(node, dict):
+        clone: Any = dict(node)
+    elif isinstance(node, list):
+        clone = list(node)
+    else:
+        raise JsonPatchError("Cannot address into a scalar value")
+
+    token = tokens[0]
+    if len(tokens) == 1:
+        change(clone, token)
+        return clone
+    if isinstance(clone, dict):
+        if token not in clone:
+            raise JsonPatchError(f"Path not found: {token!r}")
+        clone[token] = _modify(clone[token], tokens[1:], change)
+    else:
+        index = _index(clone, token)
+        clone[index] = _modify(clone[index], tokens[1:], change)
+    return clone
+
+
+def _add(doc: Any, tokens: list[str], value: Any) -> Any:
+    if not tokens:
+        return value
+
+    def change(parent: Any, token: str) -> None:
+        if isinstance(parent, dict):
+            parent[token] = value
+        else:
+            parent.insert(_index(parent, token, allow_end=True), value)
+
+    return _modify(doc, tokens, change)
+
+
+def _remove(doc: Any, tokens: list[str]) -> Any:
+    if not tokens:
+        raise JsonPatchError("Cannot remove the document root")
+
+    def change(parent: Any, token: str) -> None:
+        if isinstance(parent, dict):
+            if token not in parent:
+                raise JsonPatchError(f"Path not found: {token!r}")
+            del parent[token]
+        else:
+            del parent[_index(parent, token)]
+
+    return _modify(doc, tokens, change)
+
+
+def _replace(doc: Any, tokens: list[str], value: Any) -> Any:
+    if not tokens:
+        return value
+
+    def change(parent: Any, token: str) -> None:
+        if isinstance(parent, dict):
+            if token not in parent:
+                raise JsonPatchError(f"Path not found: {token!r}")
+            parent[token] = value
+        else:
+            parent[_index(parent, token)] = value
+
+    return _modify(doc, tokens, change)
+
+
+def apply_patch(doc: Any, operations: list[dict[str, Any]]) -> Any:
+    """Apply `operations` in order and return the new document.
+
+    Raises JsonPatchError (or JsonPatchTestFailed) and leaves `doc` untouched
+    when any operation fails, so a patch applies atomically.
+    """
+    for operation in operations:
+        if not isinstance(operation, dict) or "op" not in operation or "path" not in operation:
+            raise JsonPatchError("Each operation needs 'op' and 'path'")
+        op = operation["op"]
+        path = parse_pointer(operation["path"])
+
+        if op in ("add", "replace", "test") and "value" not in operation:
+            raise JsonPatchError(f"'{op}' requires 'value'")
+        if op in ("move", "copy") and "from" not in operation:
+            raise JsonPatchError(f"'{op}' requires 'from'")
+
+        if op == "add":
+            doc = _add(doc, path, operation["value"])
+        elif op == "remove":
+            doc = _remove(doc, path)
+        elif op == "replace":
+            doc = _replace(doc, path, operation["value"])
+        elif op == "move":
+            source = parse_pointer(operation["from"])
+            if path[: len(source)] == source and path != source:
+                raise JsonPatchError("Cannot move a value into one of its children")
+            value = resolve(doc, source)
+            doc = _add(_remove(doc, source), path, value)
+        elif op == "copy":
+            # sharing the subtree is safe: nothing is ever mutated in place
+            doc = _add(doc, path, resolve(doc, parse_pointer(operation["from"])))
+        elif op == "test":
+            if resolve(doc, path) != operation["value"]:
+                raise JsonPatchTestFailed(f"Test failed at {operation['path']}")
+        else:
+            raise JsonPatchError(f"Unknown operation: {op!r}")
+    return doc
@@ -0,0 +1,111 @@
+"""In-process denylist of revoked login sessions.
+
+Access tokens carry the session id of the login that minted them in their
+`sid` claim. Looking that id up in the database on every request would add a
+round-trip to every authenticated read, so each worker keeps the revoked ids
+in a dict and pulls new rows from the `revokedsession` table every
+`REVOCATION_SYNC_SECONDS`. Revocations issued by the worker itself take effect
+immediately; revocations from other workers take effect within one interval.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Iterable
+from uuid import UUID
+
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .config import get_settings
+from .db import async_session
+from .utils import get_utc_now
+from ..models.revoked_session import RevokedSession
+
+logger = logging.getLogger(__name__)
+
+# Re-read rows slightly older than the last watermark so revocations committed
+# by a slow transaction (or a worker with a lagging clock) are not missed.
+# Re-applying a row is idempotent.
+SYNC_OVERLAP = timedelta(seconds=30)
+# Expired rows are useless to every worker; delete them this often.
+PURGE_INTERVAL = timedelta(minutes=5)
+
+
+class RevocationList:
+    def __init__(self) -> None:
+        self._revoked: dict[str, datetime] = {}
+        self._watermark: datetime | None = None
+        self._last_purge: datetime | None = None
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    def is_revoked(self, session_id: str | None) -> bool:
+        """Return True when `session_id` has been revoked.
+
+        Expired entries may linger until the next prune; that is harmless
+        because tokens for those sessions fail the `exp` check first.
+        """
+        return session_id is not None and session_id in self._revoked
+
+    def add(self, session_id: UUID | str, expires_at: datetime) -> None:
+        self._revoked[str(session_id)] = expires_at
+
+    def prune(self, now: datetime | None = None) -> None:
+        now = now or get_utc_now()
+        self._revoked = {sid: exp for sid, exp in self._revoked.items() if exp > now}
+
+    async def sync(self, db: AsyncSession) -> int:
+        """Pull revocations recorded since the last sync. Returns rows applied."""
+        now = get_utc_now()
+        q = select(RevokedSession.session_id, RevokedSession.expires_at).where(RevokedSession.expires_at > now)
+        if self._watermark is not None:
+            q = q.where(RevokedSession.revoked_at > self._watermark - SYNC_OVERLAP)
+        result = await db.exec(q)
+        rows = result.all()
+        for session_id, expires_at in rows:
+            self.add(session_id, expires_at)
+        self._watermark = now
+        self.prune(now)
+
+        if self._last_purge is None or now - self._last_purge > PURGE_INTERVAL:
+            await db.execute(delete(RevokedSession).where(RevokedSession.expires_at <= now))
+            await db.commit()
+            self._last_purge = now
+        return len(rows)
+
+    async def revoke(self, db: AsyncSession, user_id: UUID | str, session_ids: Iterable[UUID]) -> None:
+        """Record `session_ids` as revoked and commit `db`.
+
+        The pending changes already staged on `db` (e.g. refresh tokens marked
+        revoked) are committed in the same transaction.
+        """
+        now = get_utc_now()
+        expires_at = now + timedelta(minutes=get_settings().ACCESS_TOKEN_EXPIRE_MINUTES)
+        rows = [
+            {"session_id": sid, "user_id": user_id, "revoked_at": now, "expires_at": expires_at}
+            for sid in set(session_ids)
+        ]
+        if rows:
+            stmt = insert(RevokedSession).values(rows).on_conflict_do_nothing(index_elements=["session_id"])
+            await db.execute(stmt)
+        await db.commit()
+        for row in rows:
+            self.add(row["session_id"], expires_at)
+
+    async def run(self, interval: float) -> None:
+        """Background loop: sync every `interval` seconds until cancelled."""
+        while True:
+            try:
+                async with async_session() as db:
+                    await self.sync(db)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Session revocation sync failed")
+            await asyncio.sleep(interval)
+
+
+revocation_list = RevocationList()
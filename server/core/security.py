@@ -1,54 +1,82 @@
+from contextvars import ContextVar
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional
+from uuid import uuid4
 
-from passlib.context import CryptContext
-from jose import JWTError, jwt
-
-from .config import settings
+from .config import get_settings
 from .utils import get_utc_now
 
-# Use Argon2 as the preferred password hashing scheme, while still accepting
-# legacy bcrypt hashes so they can be verified and transparently re-hashed.
-pwd_context = CryptContext(
-    schemes=["argon2", "bcrypt"],
-    deprecated=["bcrypt"],
-)
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+
+@lru_cache
+def get_pwd_context() -> "CryptContext":
+    """Build the password context on first use (passlib is only needed by
+    the auth endpoints, not by every importer of this module).
+    """
+    from passlib.context import CryptContext
+
+    # Use Argon2 as the preferred password hashing scheme, while still accepting
+    # legacy bcrypt hashes so they can be verified and transparently re-hashed.
+    return CryptContext(
+        schemes=["argon2", "bcrypt"],
+        deprecated=["bcrypt"],
+    )
 
 
 def verify_password(plain: str, hashed: str) -> bool:
-    """Verify password (returns True/False). Use `pwd_context.needs_update` in
+    """Verify password (returns True/False). Use `needs_rehash` in
     the login flow to perform automatic re-hashing when the algorithm or
     parameters are outdated.
     """
-    return pwd_context.verify(plain, hashed)
+    return get_pwd_context().verify(plain, hashed)
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 
 def needs_rehash(hashed: str) -> bool:
     """Return True when the stored hash should be upgraded to the current
     preferred algorithm/params.
     """
-    return pwd_context.needs_update(hashed)
+    return get_pwd_context().needs_update(hashed)
+
+
+def create_access_token(subject: str, expires_delta: Optional[timedelta] = None, session_id: Optional[str] = None) -> str:
+    """Create a JWT access token with timezone-aware expiration.
 
+    `session_id` is embedded as the `sid` claim so the token can be rejected
+    once its login session is revoked (see `core.revocation`).
+    """
+    from jose import jwt
 
-def create_access_token(subject: str, expires_delta: Optional[timedelta] = None) -> str:
-    """Create a JWT access token with timezone-aware expiration."""
+    settings = get_settings()
     expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode = {"sub": subject, "exp": expire}
+    to_encode = {"sub": subject, "exp": expire, "jti": uuid4().hex}
+    if session_id:
+        to_encode["sid"] = session_id
     return jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
 
 
-def create_refresh_token(subject: str, expires_delta: Optional[timedelta] = None) -> str:
+def create_refresh_token(subject: str, expires_delta: Optional[timedelta] = None, session_id: Optional[str] = None) -> str:
     """Create a JWT refresh token with timezone-aware expiration."""
+    from jose import jwt
+
+    settings = get_settings()
     expire = datetime.now(timezone.utc) + (expires_delta or timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS))
-    to_encode = {"sub": subject, "exp": expire, "typ": "refresh"}
+    to_encode = {"sub": subject, "exp": expire, "typ": "refresh", "jti": uuid4().hex}
+    if session_id:
+        to_encode["sid"] = session_id
     return jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
 
 
 def decode_token(token: str) -> dict:
+    from jose import JWTError, jwt
+
+    settings = get_settings()
     try:
         payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
         return payload
@@ -56,6 +84,11 @@ def decode_token(token: str) -> dict:
         return {}
 
 
+# (authorization header, user id) already verified for the current context;
+# set by the batch endpoint so sub-requests don't decode the same token again
+verified_authorization: ContextVar[tuple[str, str] | None] = ContextVar("verified_authorization", default=None)
+
+
 def get_current_user_id(authorization: str) -> str:
     """Extract and validate user ID from Authorization header.
     
@@ -63,9 +96,14 @@ def get_current_user_id(authorization: str) -> str:
     Raises HTTPException(401) if the token is missing, invalid, or expired.
     """
     from fastapi import HTTPException
+    from .revocation import revocation_list
     
     if not authorization:
         raise HTTPException(status_code=401, detail="Missing authorization header")
+
+    verified = verified_authorization.get()
+    if verified is not None and verified[0] == authorization:
+        return verified[1]
     
     if not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Invalid authorization header format")
@@ -75,5 +113,8 @@ def get_current_user_id(authorization: str) -> str:
     
     if not payload or "sub" not in payload:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+    if revocation_list.is_revoked(payload.get("sid")):
+        raise HTTPException(status_code=401, detail="Session has been revoked")
     
     return payload["sub"]
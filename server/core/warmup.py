@@ -0,0 +1,175 @@
+"""Startup warm-up and readiness reporting.
+
+Without warm-up the first requests after a deploy pay for opening pool
+connections, asyncpg type introspection (done per connection, including the
+JSONB codec), SQLAlchemy statement compilation and loading the passlib
+backends. `warm_up` does all of that from the lifespan hook before the worker
+accepts traffic.
+"""
+import asyncio
+import logging
+import time
+from uuid import UUID
+
+from sqlalchemy import String, or_, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlmodel import select
+
+from .config import get_settings
+from .db import get_engine
+from .security import get_pwd_context
+from ..models.post import Post
+from ..models.refresh_token import RefreshToken
+from ..models.user import User
+
+logger = logging.getLogger(__name__)
+
+_NIL = UUID(int=0)
+_ready = False
+
+
+def hot_queries() -> list:
+    """Index lookups shaped like those in api/posts.py and api/auth.py.
+
+    SQLAlchemy caches compiled SQL by statement structure, not by bound
+    values, so sentinel values that match nothing warm the same cache entries
+    as real requests. Keep these in step with the handlers.
+    """
+    return [
+        # get_post / update_post / get_post_by_short
+        select(Post).where(Post.id == _NIL),
+        select(Post).where(Post.short_id == ""),
+        # register / login / refresh / logout
+        select(User).where(User.email == ""),
+        select(RefreshToken).where(RefreshToken.token_hash == ""),
+    ]
+
+
+def planned_queries() -> list:
+    """Handler statements no index can answer for a sentinel value.
+
+    Running them would scan `post` or `refreshtoken` on every pooled
+    connection, so they are only planned (EXPLAIN, without ANALYZE).
+    """
+    return [
+        # list_posts (anonymous and authenticated)
+        select(Post).where(Post.status == "published").order_by(Post.created_at.desc()),
+        select(Post)
+        .where(or_(Post.status == "published", Post.author_id == _NIL))
+        .order_by(Post.created_at.desc()),
+        # get_post_by_short (id prefix fallback) / logout with revoke_all
+        select(Post).where(Post.id.cast(String).like("-%")),
+        select(RefreshToken).where(RefreshToken.user_id == _NIL),
+    ]
+
+
+async def _prime_connection(conn: AsyncConnection) -> None:
+    # asyncpg introspects types and prepares statements per connection
+    await conn.execute(text("SELECT 1"))
+    for stmt in hot_queries():
+        await conn.execute(stmt)
+    for stmt in planned_queries():
+        sql = stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+        await conn.exec_driver_sql(f"EXPLAIN {sql}")
+    await conn.rollback()
+
+
+async def _open_and_prime(all_open: asyncio.Event, opened: list, total: int) -> None:
+    try:
+        async with get_engine().connect() as conn:
+            await _prime_connection(conn)
+            opened.append(conn)
+            if len(opened) == total:
+                all_open.set()
+            # hold the connection until all are open so the pool grows to size
+            await all_open.wait()
+    finally:
+        # a failed connection must not leave the others waiting
+        all_open.set()
+
+
+def _load_password_backend() -> None:
+    # only the default (Argon2) scheme; legacy bcrypt hashes are rare and
+    # still load their backend lazily
+    pwd_context = get_pwd_context()
+    pwd_context.handler().get_backend()
+    # the first hash also initializes the cffi bindings
+    pwd_context.hash("warm-up")
+
+
+async def warm_up() -> bool:
+    """Open `DB_POOL_SIZE` connections and prime statement and crypto caches.
+
+    Gives up after `WARMUP_TIMEOUT_SECONDS`; the worker reports ready only
+    if everything succeeded.
+    """
+    global _ready
+    started = time.perf_counter()
+    settings = get_settings()
+    pool_size = settings.DB_POOL_SIZE
+    all_open = asyncio.Event()
+    opened: list = []
+    try:
+        results = await asyncio.wait_for(
+            asyncio.gather(
+                asyncio.to_thread(_load_password_backend),
+                *(_open_and_prime(all_open, opened, pool_size) for _ in range(pool_size)),
+                return_exceptions=True,
+            ),
+            timeout=settings.WARMUP_TIMEOUT_SECONDS,
+        )
+    except asyncio.TimeoutError:
+        logger.warning("Warm-up timed out after %.0f s", settings.WARMUP_TIMEOUT_SECONDS)
+        return False
+    errors = [r for r in results if isinstance(r, Exception)]
+    if errors:
+        logger.warning("Warm-up failed: %s", errors[0])
+        return False
+    logger.info("Warm-up finished in %.0f ms", (time.perf_counter() - started) * 1000)
+    _ready = True
+    return True
+
+
+async def retry_warm_up(interval: float) -> None:
+    """Repeat a failed warm-up every `interval` seconds until it succeeds."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            if await warm_up():
+                return
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Warm-up retry failed")
+
+
+def mark_ready() -> None:
+    """Used when warm-up is disabled."""
+    global _ready
+    _ready = True
+
+
+async def _ping() -> None:
+    async with get_engine().connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def readiness() -> tuple[bool, dict]:
+    """Return (ready, details) for the /health probe."""
+    pool = get_engine().pool
+    details: dict = {
+        "warmed_up": _ready,
+        "pool": {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": pool.overflow(),
+        },
+    }
+    try:
+        await asyncio.wait_for(_ping(), timeout=2)
+        details["database"] = "ok"
+    except Exception as exc:
+        details["database"] = f"unreachable: {type(exc).__name__}"
+        return False, details
+    return _ready, details
@@ -1,9 +1,58 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+
+from .api import auth, batch, posts, comments, feeds, moderation
+from .core.config import get_settings
+from .core.db import async_session
+from .core.revocation import revocation_list
+from .core.warmup import mark_ready, readiness, retry_warm_up, warm_up
+from .services import partitions
+from .services.outbox import create_runner
+from .services.trending import get_scorer
+from .services.views import get_view_counter
+
 
-from .api import auth, posts, comments
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    settings = get_settings()
+    scorer = get_scorer()
+    view_counter = get_view_counter()
+    background = []
+    if not settings.WARMUP_ON_STARTUP:
+        mark_ready()
+    elif not await warm_up():
+        # serve anyway (the probe keeps reporting 503) and try again
+        background.append(asyncio.create_task(retry_warm_up(settings.WARMUP_TIMEOUT_SECONDS)))
+    # keep the in-memory session denylist in step with other workers
+    revocation_sync = asyncio.create_task(revocation_list.run(settings.REVOCATION_SYNC_SECONDS))
+    trending = asyncio.create_task(
+        scorer.run(settings.TRENDING_FLUSH_SECONDS, settings.TRENDING_REFRESH_SECONDS, settings.TRENDING_SIZE)
+    )
+    view_flush = asyncio.create_task(view_counter.run(settings.VIEW_FLUSH_SECONDS))
+    partition_upkeep = asyncio.create_task(
+        partitions.run(settings.PARTITION_CHECK_SECONDS, settings.PARTITION_MONTHS_AHEAD)
+    )
+    background += [revocation_sync, trending, view_flush, partition_upkeep]
+    if settings.OUTBOX_IN_PROCESS:
+        # otherwise run `python -m server.services.outbox` separately
+        background.append(asyncio.create_task(create_runner().run(settings.OUTBOX_POLL_SECONDS)))
+    yield
+    for task in background:
+        task.cancel()
+    # a flush interrupted by the cancel puts its buffer back before this returns
+    await asyncio.gather(*background, return_exceptions=True)
+    # don't drop activity and views buffered since the last flush
+    async with async_session() as db:
+        await scorer.flush(db)
+        await view_counter.flush(db)
 
-app = FastAPI(title="Blogging Platform API")
+
+app = FastAPI(title="Blogging Platform API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -13,11 +62,34 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+class CompressionMiddleware:
+    """GZipMiddleware with its threshold read from settings on the first
+    request, so importing this module doesn't build Settings()."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+        self._gzip: GZipMiddleware | None = None
+
+    async def __call__(self, scope, receive, send) -> None:
+        if self._gzip is None:
+            self._gzip = GZipMiddleware(self.app, minimum_size=get_settings().COMPRESSION_MIN_SIZE)
+        await self._gzip(scope, receive, send)
+
+
+# post reads are pre-compressed in core.http_cache and pass through untouched
+app.add_middleware(CompressionMiddleware)
+
 app.include_router(auth.router)
 app.include_router(posts.router)
 app.include_router(comments.router)
+app.include_router(feeds.router)
+app.include_router(moderation.router)
+app.include_router(batch.router)
 
 
 @app.get("/health")
 async def health():
-    return {"status": "ok"}
+    """Readiness probe: 503 until warm-up finished and while the DB is unreachable."""
+    ready, details = await readiness()
+    return JSONResponse({"status": "ok" if ready else "unavailable", **details}, status_code=200 if ready else 503)
@@ -5,9 +5,14 @@ from .comment import Comment
 from .tag import Tag
 from .post_tag import PostTag
 from .post_like import PostLike
+from .post_revision import PostRevision
+from .post_view import PostViewStats
 from .bookmark import Bookmark
 from .media import Media
 from .refresh_token import RefreshToken
+from .outbox import OutboxEvent
+from .revoked_session import RevokedSession
+from .trending import PostScore, TrendingPost
 
 __all__ = [
     "User",
@@ -16,7 +21,13 @@ __all__ = [
     "Tag",
     "PostTag",
     "PostLike",
+    "PostRevision",
+    "PostViewStats",
     "Bookmark",
     "Media",
     "RefreshToken",
+    "OutboxEvent",
+    "RevokedSession",
+    "PostScore",
+    "TrendingPost",
 ]
@@ -1,13 +1,15 @@
-from uuid import UUID, uuid4
+from uuid import UUID
 from datetime import datetime
 from sqlmodel import SQLModel, Field
 
+from ..core.utils import get_utc_now, uuid7
+
 
 class Bookmark(SQLModel, table=True):
-    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    id: UUID = Field(default_factory=uuid7, primary_key=True)
     user_id: UUID = Field(foreign_key="user.id")
     post_id: UUID = Field(foreign_key="post.id")
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=get_utc_now)
 
     model_config = {
         "json_schema_extra": {"unique": ["user_id", "post_id"]}
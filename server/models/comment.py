@@ -1,16 +1,40 @@
 from typing import Optional
-from uuid import UUID, uuid4
+from uuid import UUID
 from datetime import datetime
 
 from sqlmodel import SQLModel, Field
+from sqlalchemy import Index, text
+
+from ..core.utils import get_utc_now, uuid7
 
 
 class Comment(SQLModel, table=True):
-    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    """`is_moderated` is false while a comment waits in the moderation queue.
+
+    Range-partitioned by month on `created_at` (services.partitions), which is
+    therefore part of the primary key.
+    """
+
+    __table_args__ = (
+        # public reads only ever see approved comments
+        Index("ix_comment_approved", "post_id", "created_at", postgresql_where=text("is_moderated")),
+        # the moderation queue, oldest first
+        Index("ix_comment_pending", "created_at", postgresql_where=text("NOT is_moderated")),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+    id: UUID = Field(default_factory=uuid7, primary_key=True)
     post_id: UUID = Field(foreign_key="post.id")
     author_id: Optional[UUID] = Field(default=None, foreign_key="user.id")
-    parent_id: Optional[UUID] = Field(default=None, foreign_key="comment.id")
+    # no foreign key: one would have to include the parent's created_at;
+    # add_comment checks the parent exists
+    parent_id: Optional[UUID] = None
     content: str
     is_moderated: bool = False
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=get_utc_now, primary_key=True)
     updated_at: Optional[datetime] = None
+
+
+class CommentCreate(SQLModel):
+    content: str = Field(min_length=1, max_length=10_000)
+    parent_id: Optional[UUID] = None
@@ -0,0 +1,34 @@
+from typing import Any, Dict, Optional
+from uuid import UUID
+from datetime import datetime
+
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Column, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
+
+from ..core.utils import get_utc_now, uuid7
+
+
+class OutboxEvent(SQLModel, table=True):
+    """A side effect to run after the transaction that wrote it commits.
+
+    Written through `services.outbox.enqueue` in the same transaction as the
+    change it describes and processed by the outbox runner. `status` is
+    "pending", "done" or "dead" (retries exhausted); a pending event becomes
+    claimable once `available_at` has passed.
+    """
+
+    __table_args__ = (
+        # the runner only ever scans claimable events
+        Index("ix_outboxevent_pending", "available_at", postgresql_where=text("status = 'pending'")),
+    )
+
+    id: UUID = Field(default_factory=uuid7, primary_key=True)
+    topic: str
+    payload: Dict[str, Any] = Field(sa_column=Column(JSONB, nullable=False))
+    status: str = "pending"
+    attempts: int = 0
+    available_at: datetime = Field(default_factory=get_utc_now)
+    last_error: Optional[str] = None
+    created_at: datetime = Field(default_factory=get_utc_now)
+    processed_at: Optional[datetime] = None
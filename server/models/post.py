@@ -4,7 +4,7 @@ from datetime import datetime
 
 from sqlmodel import SQLModel, Field
 from typing import Optional, Any, Dict
-from sqlalchemy import Column
+from sqlalchemy import Column, Index, text
 from sqlalchemy.dialects.postgresql import JSONB
 
 
@@ -17,6 +17,14 @@ def _default_created_at():
 
 
 class Post(SQLModel, table=True):
+    __table_args__ = (
+        # newest-first feeds (site-wide and per author) read only published posts
+        Index("ix_post_published_at", "published_at", postgresql_where=text("status = 'published'")),
+        Index("ix_post_author_id_published_at", "author_id", "published_at", postgresql_where=text("status = 'published'")),
+    )
+
+    # random, unlike the other tables' uuid7 keys: short_id (and the client's
+    # short links) is the first 8 hex digits, which are timestamp bits in a uuid7
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     author_id: UUID = Field(foreign_key="user.id")
     title: str
@@ -1,13 +1,18 @@
-from uuid import UUID, uuid4
+from uuid import UUID
 from datetime import datetime
 from sqlmodel import SQLModel, Field
 
+from ..core.utils import get_utc_now, uuid7
+
 
 class PostLike(SQLModel, table=True):
-    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    # range-partitioned by month on created_at, like comment (services.partitions)
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
+
+    id: UUID = Field(default_factory=uuid7, primary_key=True)
     user_id: UUID = Field(foreign_key="user.id")
     post_id: UUID = Field(foreign_key="post.id")
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=get_utc_now, primary_key=True)
 
     model_config = {
         "json_schema_extra": {"unique": ["user_id", "post_id"]}
@@ -0,0 +1,28 @@
+from typing import Optional
+from uuid import UUID
+from datetime import datetime
+
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Column, LargeBinary, UniqueConstraint
+
+from ..core.utils import uuid7
+
+
+class PostRevision(SQLModel, table=True):
+    """One historical version of a post's title/summary/content.
+
+    Revisions are numbered per post. A revision whose `number` equals its
+    `snapshot_number` stores the full fields; every other one stores a delta
+    against the revision before it (see `services.revisions`), so rebuilding
+    any revision reads at most one snapshot plus the deltas after it.
+    """
+
+    __table_args__ = (UniqueConstraint("post_id", "number"),)
+
+    id: UUID = Field(default_factory=uuid7, primary_key=True)
+    post_id: UUID = Field(foreign_key="post.id")
+    number: int
+    snapshot_number: int
+    author_id: Optional[UUID] = Field(default=None, foreign_key="user.id")
+    data: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+    created_at: datetime
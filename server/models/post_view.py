@@ -0,0 +1,18 @@
+from uuid import UUID
+from datetime import date
+
+from sqlmodel import SQLModel, Field
+from sqlalchemy import BigInteger, Column, LargeBinary
+
+
+class PostViewStats(SQLModel, table=True):
+    """Views of a post on one (UTC) day, written in batches by `services.views`.
+
+    `visitors` is a serialized HyperLogLog sketch of the distinct visitors
+    seen that day (see `core.hyperloglog`).
+    """
+
+    post_id: UUID = Field(foreign_key="post.id", primary_key=True)
+    day: date = Field(primary_key=True)
+    views: int = Field(default=0, sa_column=Column(BigInteger, nullable=False))
+    visitors: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
@@ -1,14 +1,19 @@
-from uuid import UUID, uuid4
+from uuid import UUID
 from datetime import datetime
 from sqlmodel import SQLModel, Field
 
+from ..core.utils import get_utc_now, uuid7
+
 
 class RefreshToken(SQLModel, table=True):
-    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    id: UUID = Field(default_factory=uuid7, primary_key=True)
     user_id: UUID = Field(foreign_key="user.id")
-    token_hash: str
+    # stable across refresh rotation; carried as the `sid` claim in access tokens
+    session_id: UUID | None = Field(default=None, index=True)
+    # looked up on every refresh and logout
+    token_hash: str = Field(index=True)
     user_agent: str | None = None
     ip: str | None = None
     expires_at: datetime | None = None
     revoked: bool = False
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=get_utc_now)
@@ -0,0 +1,18 @@
+from uuid import UUID
+from datetime import datetime
+
+from sqlmodel import SQLModel, Field
+
+
+class RevokedSession(SQLModel, table=True):
+    """A login session whose access tokens must be rejected before they expire.
+
+    Rows only need to live until `expires_at` (revocation time plus the access
+    token lifetime); after that every access token for the session is expired
+    anyway and the row can be pruned.
+    """
+
+    session_id: UUID = Field(primary_key=True)
+    user_id: UUID = Field(foreign_key="user.id")
+    revoked_at: datetime = Field(index=True)
+    expires_at: datetime = Field(index=True)
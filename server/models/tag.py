@@ -1,8 +1,10 @@
-from uuid import UUID, uuid4
+from uuid import UUID
 from sqlmodel import SQLModel, Field
 
+from ..core.utils import uuid7
+
 
 class Tag(SQLModel, table=True):
-    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    id: UUID = Field(default_factory=uuid7, primary_key=True)
     name: str
     slug: str
@@ -0,0 +1,28 @@
+from uuid import UUID
+from datetime import datetime
+
+from sqlmodel import SQLModel, Field
+
+
+class PostScore(SQLModel, table=True):
+    """Running time-decayed activity score of a post.
+
+    `log_score` is the natural log of the sum of activity weights, each scaled
+    by exp((t - epoch) / tau) (see `services.trending`). Because every event is
+    scaled against the same fixed epoch, scores never need to be decayed in
+    place: comparing two rows at any moment gives the same order as comparing
+    their decayed values.
+    """
+
+    post_id: UUID = Field(foreign_key="post.id", primary_key=True)
+    log_score: float = Field(index=True)
+    updated_at: datetime
+
+
+class TrendingPost(SQLModel, table=True):
+    """Materialized top-N of `PostScore` among published posts, read by the feed."""
+
+    rank: int = Field(primary_key=True)
+    post_id: UUID = Field(foreign_key="post.id")
+    log_score: float
+    materialized_at: datetime
@@ -0,0 +1,81 @@
+"""Production entry point for Linux hosts.
+
+    python -m server.serve --port 5000 [--workers N] [--loop uvloop] [--http httptools]
+
+The worker count defaults to $WEB_CONCURRENCY, else the CPUs this process may
+actually use (affinity mask and cgroup quota, so containers are sized
+correctly). Each worker is a separate process with its own DB pool of
+`DB_POOL_SIZE` connections, so size Postgres' max_connections accordingly.
+For development keep using `uvicorn server.main:app --reload`.
+"""
+import argparse
+import importlib.util
+import logging
+import math
+import os
+
+import uvicorn
+
+logger = logging.getLogger(__name__)
+
+
+def available_cpus() -> int:
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # not Linux
+        cpus = os.cpu_count() or 1
+    try:
+        # cgroup v2: "<quota> <period>" or "max <period>"
+        with open("/sys/fs/cgroup/cpu.max") as fh:
+            quota, period = fh.read().split()
+        if quota != "max":
+            cpus = min(cpus, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    return max(cpus, 1)
+
+
+def default_workers() -> int:
+    env = os.getenv("WEB_CONCURRENCY")
+    if env:
+        return max(int(env), 1)
+    return available_cpus()
+
+
+def resolve(choice: str, fast: str, fallback: str) -> str:
+    """Pick `fast` for "auto" when its module is installed."""
+    if choice != "auto":
+        return choice
+    return fast if importlib.util.find_spec(fast) is not None else fallback
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the API with multiple workers")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "5000")))
+    parser.add_argument("--workers", type=int, default=None, help="default: $WEB_CONCURRENCY or usable CPUs")
+    parser.add_argument("--loop", choices=["auto", "uvloop", "asyncio"], default="auto")
+    parser.add_argument("--http", choices=["auto", "httptools", "h11"], default="auto")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    workers = args.workers or default_workers()
+    loop = resolve(args.loop, "uvloop", "asyncio")
+    http = resolve(args.http, "httptools", "h11")
+    logger.info("Starting %d worker(s) on %s:%d (loop=%s, http=%s)", workers, args.host, args.port, loop, http)
+
+    uvicorn.run(
+        "server.main:app",
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        loop=loop,
+        http=http,
+        log_level=args.log_level,
+        proxy_headers=True,
+    )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
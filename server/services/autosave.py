@@ -0,0 +1,174 @@
+"""Editor autosave of `content_json` through RFC 6902 JSON Patch.
+
+Autosave requests carry only the operations for what changed instead of the
+whole document. Each worker keeps the latest `content_json` of recently edited
+posts in memory, keyed by post id and the committed version (`updated_at`),
+so applying a patch needs no read. Patches for the same post that arrive
+within `AUTOSAVE_COALESCE_SECONDS` are written with a single UPDATE and every
+request in the window returns once that UPDATE commits (group commit), so
+nothing is acknowledged before it is durable.
+
+The UPDATE is conditional on the version the patches were applied to. If
+another worker or a PUT changed the post in the meantime, the write is
+rejected with 409 and the client reloads; patches are never applied to a
+stale copy silently.
+"""
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from typing import Any
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import update
+from sqlmodel import select
+
+from ..core.config import get_settings
+from ..core.db import async_session
+from ..core.http_cache import entity_tag, etag_matches
+from ..core.json_patch import JsonPatchError, JsonPatchTestFailed, apply_patch
+from ..core.utils import get_utc_now
+from ..models.post import Post
+from .outbox import enqueue
+from .revisions import record_revision
+
+# documents kept per worker; entries with an unflushed batch are never evicted
+MAX_CACHED_DOCUMENTS = 256
+
+
+@dataclass
+class _Entry:
+    author_id: UUID
+    created_at: datetime
+    updated_at: datetime | None
+    doc: Any
+
+    @property
+    def version(self) -> datetime:
+        return self.updated_at or self.created_at
+
+
+@dataclass
+class _Batch:
+    author_id: UUID
+    base_updated_at: datetime | None
+    base_doc: Any
+    doc: Any
+    done: asyncio.Future
+    task: asyncio.Task | None = field(default=None, repr=False)
+
+
+class ContentAutosaver:
+    def __init__(self, window: float) -> None:
+        self.window = window
+        self._docs: OrderedDict[UUID, _Entry] = OrderedDict()
+        self._pending: dict[UUID, _Batch] = {}
+        self._locks: dict[UUID, asyncio.Lock] = {}
+
+    async def apply(self, post_id: UUID, user_id: str, if_match: str | None, operations: list[dict[str, Any]]) -> datetime:
+        """Apply `operations` to the post's content_json; returns the new version."""
+        lock = self._locks.setdefault(post_id, asyncio.Lock())
+        async with lock:
+            entry = self._docs.get(post_id)
+            if entry is None:
+                try:
+                    entry = await self._load(post_id)
+                except HTTPException as exc:
+                    # ids come from the client: don't keep a lock per unknown post
+                    if exc.status_code == 404 and self._locks.get(post_id) is lock:
+                        del self._locks[post_id]
+                    raise
+            self._docs.move_to_end(post_id)
+
+            if str(entry.author_id) != user_id:
+                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You can only update your own posts")
+            # read ETags also carry the counters, which don't matter to an edit
+            if if_match and not etag_matches(if_match, entity_tag(post_id, entry.version), ignore_variant=True):
+                raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail="Post has changed; reload before saving")
+
+            previous = entry.doc
+            try:
+                entry.doc = apply_patch(entry.doc, operations)
+            except JsonPatchTestFailed as exc:
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc)) from exc
+            except JsonPatchError as exc:
+                raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)) from exc
+
+            batch = self._pending.get(post_id)
+            if batch is None:
+                batch = _Batch(entry.author_id, entry.updated_at, previous, entry.doc, asyncio.get_running_loop().create_future())
+                batch.task = asyncio.create_task(self._flush_later(post_id, batch))
+                self._pending[post_id] = batch
+            batch.doc = entry.doc
+
+        # shield: a disconnecting client must not cancel the shared write
+        return await asyncio.shield(batch.done)
+
+    def forget(self, post_id: UUID | str) -> None:
+        """Drop the cached document, e.g. after a full update through PUT."""
+        post_id = post_id if isinstance(post_id, UUID) else UUID(post_id)
+        self._docs.pop(post_id, None)
+
+    async def _load(self, post_id: UUID) -> _Entry:
+        async with async_session() as db:
+            q = select(Post.author_id, Post.created_at, Post.updated_at, Post.content_json).where(Post.id == post_id)
+            result = await db.exec(q)
+            row = result.one_or_none()
+        if row is None:
+            raise HTTPException(status_code=404, detail="Post not found")
+        entry = _Entry(*row)
+        self._docs[post_id] = entry
+        self._evict()
+        return entry
+
+    def _evict(self) -> None:
+        for post_id in list(self._docs):
+            if len(self._docs) <= MAX_CACHED_DOCUMENTS:
+                break
+            if post_id in self._pending:
+                continue
+            del self._docs[post_id]
+            lock = self._locks.get(post_id)
+            if lock is not None and not lock.locked():
+                del self._locks[post_id]
+
+    async def _flush_later(self, post_id: UUID, batch: _Batch) -> None:
+        await asyncio.sleep(self.window)
+        async with self._locks[post_id]:
+            self._pending.pop(post_id, None)
+            try:
+                now = get_utc_now()
+                unchanged = (
+                    Post.updated_at.is_(None) if batch.base_updated_at is None else Post.updated_at == batch.base_updated_at
+                )
+                async with async_session() as db:
+                    result = await db.execute(
+                        update(Post).where(Post.id == post_id, unchanged).values(content_json=batch.doc, updated_at=now)
+                    )
+                    if result.rowcount == 0:
+                        await db.rollback()
+                        self._docs.pop(post_id, None)
+                        batch.done.set_exception(
+                            HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Post was changed concurrently; reload before saving")
+                        )
+                        return
+                    # the UPDATE holds the row lock, so revision numbers can't race
+                    await record_revision(db, post_id, batch.author_id, {"content_json": batch.base_doc}, {"content_json": batch.doc})
+                    enqueue(db, "post.updated", {"post_id": str(post_id), "fields": ["content_json"]})
+                    await db.commit()
+            except Exception as exc:
+                self._docs.pop(post_id, None)
+                batch.done.set_exception(exc)
+                return
+
+            entry = self._docs.get(post_id)
+            if entry is not None:
+                entry.updated_at = now
+            batch.done.set_result(now)
+
+
+@lru_cache
+def get_autosaver() -> ContentAutosaver:
+    return ContentAutosaver(get_settings().AUTOSAVE_COALESCE_SECONDS)
@@ -0,0 +1,250 @@
+"""RSS/Atom feeds and the sitemap.
+
+Feeds list the latest FEED_SIZE published posts (site-wide, per author or per
+tag), so they are small and go through `core.http_cache` like post reads:
+validated by the newest change among the listed posts, rendered once per
+version and served pre-compressed. Only summaries are included; post bodies
+are never loaded.
+
+The sitemap is an index of shards of at most SITEMAP_SHARD_SIZE URLs. A shard
+is a keyset range over `post.id` named by its first id, so serving any shard
+is one primary-key range scan, and its body is streamed from a server-side
+cursor a partition at a time: memory use does not grow with the number of
+posts. Building the shard list takes one pass over all published posts and
+is reused per worker for SITEMAP_CACHE_SECONDS.
+"""
+import asyncio
+import hashlib
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from functools import lru_cache
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Sequence
+from uuid import UUID
+from xml.sax.saxutils import escape, quoteattr
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..core.config import get_settings
+from ..core.db import async_session
+from ..models.post import Post
+from ..models.post_tag import PostTag
+from ..models.user import User
+
+# Last-Modified of an empty feed or sitemap
+EPOCH = datetime(1970, 1, 1)
+# rows fetched from the server-side cursor per round trip
+PARTITION_SIZE = 1000
+
+PUBLISHED = Post.status == "published"
+CHANGED_AT = func.coalesce(Post.updated_at, Post.published_at, Post.created_at)
+
+
+def _utc(value: datetime) -> datetime:
+    # database timestamps are naive UTC (see core.utils.get_utc_now)
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def _w3c(value: datetime) -> str:
+    return _utc(value).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+
+
+def cache_key(*parts: object) -> str:
+    """Short digest identifying one version of a generated document."""
+    digest = hashlib.blake2b(digest_size=8)
+    for part in parts:
+        digest.update(part.bytes if isinstance(part, UUID) else str(part).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def post_url(short_id: str | None, post_id: UUID, slug: str) -> str:
+    """Canonical client URL of a post (`/posts/<short id>-<slug>`)."""
+    base = get_settings().SITE_URL.rstrip("/")
+    return f"{base}/posts/{short_id or str(post_id).split('-')[0]}-{slug}"
+
+
+# -- feeds --------------------------------------------------------------------
+
+
+def feed_query(size: int, author_id: UUID | None = None, tag_id: UUID | None = None):
+    q = (
+        select(
+            Post.id,
+            Post.short_id,
+            Post.slug,
+            Post.title,
+            Post.summary,
+            Post.published_at,
+            CHANGED_AT.label("changed_at"),
+            func.coalesce(User.display_name, User.username).label("author_name"),
+        )
+        .join(User, User.id == Post.author_id)
+        # matches the partial index scanned backwards
+        .where(PUBLISHED, Post.published_at.is_not(None))
+        .order_by(Post.published_at.desc(), Post.id.desc())
+        .limit(size)
+    )
+    if author_id is not None:
+        q = q.where(Post.author_id == author_id)
+    if tag_id is not None:
+        q = q.join(PostTag, PostTag.post_id == Post.id).where(PostTag.tag_id == tag_id)
+    return q
+
+
+async def load_feed(db: AsyncSession, size: int, author_id: UUID | None = None, tag_id: UUID | None = None) -> list[Any]:
+    result = await db.execute(feed_query(size, author_id, tag_id))
+    return result.all()
+
+
+def feed_modified_at(entries: Sequence[Any]) -> datetime:
+    return max((entry.changed_at for entry in entries), default=EPOCH)
+
+
+def render_rss(title: str, self_url: str, entries: Sequence[Any]) -> bytes:
+    site = escape(get_settings().SITE_URL)
+    parts = [
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom" xmlns:dc="http://purl.org/dc/elements/1.1/"><channel>',
+        f"<title>{escape(title)}</title><link>{site}</link><description>{escape(title)}</description>",
+        f'<atom:link href={quoteattr(self_url)} rel="self" type="application/rss+xml"/>',
+        f"<lastBuildDate>{format_datetime(_utc(feed_modified_at(entries)), usegmt=True)}</lastBuildDate>",
+    ]
+    for entry in entries:
+        url = escape(post_url(entry.short_id, entry.id, entry.slug))
+        parts.append(f"<item><title>{escape(entry.title)}</title><link>{url}</link>")
+        parts.append(f'<guid isPermaLink="false">urn:uuid:{entry.id}</guid>')
+        if entry.published_at is not None:
+            parts.append(f"<pubDate>{format_datetime(_utc(entry.published_at), usegmt=True)}</pubDate>")
+        if entry.author_name:
+            parts.append(f"<dc:creator>{escape(entry.author_name)}</dc:creator>")
+        if entry.summary:
+            parts.append(f"<description>{escape(entry.summary)}</description>")
+        parts.append("</item>")
+    parts.append("</channel></rss>")
+    return "".join(parts).encode()
+
+
+def render_atom(title: str, self_url: str, entries: Sequence[Any]) -> bytes:
+    site = quoteattr(get_settings().SITE_URL)
+    parts = [
+        '<?xml version="1.0" encoding="utf-8"?>\n<feed xmlns="http://www.w3.org/2005/Atom">',
+        f"<id>{escape(self_url)}</id><title>{escape(title)}</title>",
+        f"<updated>{_w3c(feed_modified_at(entries))}</updated>",
+        f'<link href={quoteattr(self_url)} rel="self"/><link href={site}/>',
+    ]
+    for entry in entries:
+        url = quoteattr(post_url(entry.short_id, entry.id, entry.slug))
+        parts.append(f"<entry><id>urn:uuid:{entry.id}</id><title>{escape(entry.title)}</title><link href={url}/>")
+        parts.append(f"<updated>{_w3c(entry.changed_at)}</updated>")
+        if entry.published_at is not None:
+            parts.append(f"<published>{_w3c(entry.published_at)}</published>")
+        parts.append(f"<author><name>{escape(entry.author_name or 'unknown')}</name></author>")
+        if entry.summary:
+            parts.append(f"<summary>{escape(entry.summary)}</summary>")
+        parts.append("</entry>")
+    parts.append("</feed>")
+    return "".join(parts).encode()
+
+
+# -- sitemap ------------------------------------------------------------------
+
+
+async def load_shards(db: AsyncSession, shard_size: int) -> list[Any]:
+    """(first_id, changed_at, urls) per shard, in id order."""
+    numbered = (
+        select(
+            Post.id,
+            CHANGED_AT.label("changed_at"),
+            ((func.row_number().over(order_by=Post.id) - 1) // shard_size).label("shard"),
+        )
+        .where(PUBLISHED)
+        .subquery()
+    )
+    q = (
+        select(
+            # there is no min() for uuid
+            func.array_agg(aggregate_order_by(numbered.c.id, numbered.c.id))[1].label("first_id"),
+            func.max(numbered.c.changed_at).label("changed_at"),
+            func.count().label("urls"),
+        )
+        .group_by(numbered.c.shard)
+        .order_by(numbered.c.shard)
+    )
+    result = await db.execute(q)
+    return result.all()
+
+
+class SitemapShards:
+    """Per-worker cache of the sitemap shard list."""
+
+    def __init__(self, shard_size: int, ttl: float) -> None:
+        self.shard_size = shard_size
+        self.ttl = ttl
+        self._shards: list[Any] | None = None
+        self._expires = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get(self, db: AsyncSession) -> list[Any]:
+        async with self._lock:
+            if self._shards is None or time.monotonic() >= self._expires:
+                self._shards = await load_shards(db, self.shard_size)
+                self._expires = time.monotonic() + self.ttl
+            return self._shards
+
+
+@lru_cache
+def get_sitemap_shards() -> SitemapShards:
+    settings = get_settings()
+    return SitemapShards(settings.SITEMAP_SHARD_SIZE, settings.SITEMAP_CACHE_SECONDS)
+
+
+def render_sitemap_index(shards: Iterable[Any], shard_url) -> bytes:
+    """`shard_url(first_id)` gives the location of each shard."""
+    parts = ['<?xml version="1.0" encoding="utf-8"?>\n<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+    for shard in shards:
+        parts.append(f"<sitemap><loc>{escape(shard_url(shard.first_id))}</loc><lastmod>{_w3c(shard.changed_at)}</lastmod></sitemap>")
+    parts.append("</sitemapindex>")
+    return "".join(parts).encode()
+
+
+def shard_query(first_id: UUID, shard_size: int):
+    return (
+        select(Post.id, Post.short_id, Post.slug, CHANGED_AT.label("changed_at"))
+        .where(PUBLISHED, Post.id >= first_id)
+        .order_by(Post.id)
+        .limit(shard_size)
+    )
+
+
+async def shard_version(db: AsyncSession, first_id: UUID, shard_size: int) -> tuple[int, datetime]:
+    """Number of URLs and last change in a shard, for its validators."""
+    shard = shard_query(first_id, shard_size).subquery()
+    result = await db.execute(select(func.count(), func.max(shard.c.changed_at)))
+    urls, changed_at = result.one()
+    return urls, changed_at or EPOCH
+
+
+async def render_urlset(partitions: AsyncIterable[Sequence[Any]]) -> AsyncIterator[bytes]:
+    """Encode (id, short_id, slug, changed_at) rows one partition at a time."""
+    base = escape(get_settings().SITE_URL.rstrip("/"))
+    yield b'<?xml version="1.0" encoding="utf-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+    async for rows in partitions:
+        # same URL as post_url, inlined: this runs once per post
+        yield "".join(
+            f"<url><loc>{base}/posts/{escape(row.short_id or str(row.id)[:8])}-{escape(row.slug)}</loc>"
+            f"<lastmod>{row.changed_at:%Y-%m-%dT%H:%M:%S}Z</lastmod></url>"
+            for row in rows
+        ).encode()
+    yield b"</urlset>"
+
+
+async def stream_shard(first_id: UUID, shard_size: int) -> AsyncIterator[bytes]:
+    # own session: the response body is sent after the request's session closed
+    async with async_session() as db:
+        result = await db.stream(shard_query(first_id, shard_size).execution_options(yield_per=PARTITION_SIZE))
+        async for chunk in render_urlset(result.partitions()):
+            yield chunk
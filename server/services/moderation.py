@@ -0,0 +1,142 @@
+"""Comment moderation: automatic pre-screening and the bulk review queue.
+
+New comments are screened before they are stored. Rules come from settings
+(MODERATION_REJECT_RULES / MODERATION_HOLD_RULES): plain entries are whole-word
+keywords, entries prefixed with "re:" are regular expressions. Each list is
+compiled once into a single alternation, so screening is one regex scan per
+list however many rules there are. Further screeners (spam scoring, an
+external classifier) plug in with the `screener` decorator.
+
+Screening runs in a worker thread so a long comment or an expensive pattern
+never stalls the event loop. Rejected comments are not stored; held ones
+wait in the queue (`is_moderated = false`) until a moderator approves or
+rejects them in bulk, each as a single statement over all given ids.
+"""
+import asyncio
+import re
+from enum import Enum
+from functools import lru_cache
+from typing import Callable, Iterable, Optional
+from uuid import UUID
+
+from sqlalchemy import Uuid, any_, bindparam, delete, tuple_, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..core.config import get_settings
+from ..core.utils import get_utc_now
+from ..models.comment import Comment
+from .outbox import enqueue
+from .trending import Activity, get_scorer
+
+
+class Verdict(str, Enum):
+    approve = "approve"
+    hold = "hold"
+    reject = "reject"
+
+
+# most severe verdict wins when screeners disagree
+SEVERITY = {Verdict.approve: 0, Verdict.hold: 1, Verdict.reject: 2}
+
+Screener = Callable[[str], Optional[Verdict]]
+
+_screeners: list[Screener] = []
+
+
+def screener(fn: Screener) -> Screener:
+    """Register an extra screener; it returns a verdict or None to abstain."""
+    _screeners.append(fn)
+    return fn
+
+
+def compile_rules(rules: Iterable[str]) -> re.Pattern | None:
+    """One case-insensitive pattern matching any keyword or "re:" rule."""
+    alternatives = [
+        f"(?:{rule[3:]})" if rule.startswith("re:") else rf"\b{re.escape(rule)}\b"
+        for rule in rules
+        if rule.strip()
+    ]
+    if not alternatives:
+        return None
+    return re.compile("|".join(alternatives), re.IGNORECASE)
+
+
+class RuleScreener:
+    def __init__(self, reject_rules: Iterable[str], hold_rules: Iterable[str]) -> None:
+        self.reject = compile_rules(reject_rules)
+        self.hold = compile_rules(hold_rules)
+
+    def __call__(self, content: str) -> Verdict | None:
+        if self.reject is not None and self.reject.search(content):
+            return Verdict.reject
+        if self.hold is not None and self.hold.search(content):
+            return Verdict.hold
+        return None
+
+
+@lru_cache
+def get_rule_screener() -> RuleScreener:
+    settings = get_settings()
+    return RuleScreener(settings.MODERATION_REJECT_RULES, settings.MODERATION_HOLD_RULES)
+
+
+def screen(content: str) -> Verdict:
+    verdicts = [fn(content) for fn in (get_rule_screener(), *_screeners)]
+    verdicts = [verdict for verdict in verdicts if verdict is not None]
+    if verdicts:
+        return max(verdicts, key=SEVERITY.__getitem__)
+    return Verdict.approve if get_settings().MODERATION_AUTO_APPROVE else Verdict.hold
+
+
+async def prescreen(content: str) -> Verdict:
+    return await asyncio.to_thread(screen, content)
+
+
+async def pending_comments(db: AsyncSession, limit: int, after: Optional[UUID] = None) -> list[Comment]:
+    """Oldest pending comments first; `after` is the last id of the previous page."""
+    # written as the index predicate so the planner can use ix_comment_pending
+    q = select(Comment).where(~Comment.is_moderated)
+    if after is not None:
+        last = select(Comment.created_at).where(Comment.id == after).scalar_subquery()
+        # the plain bound is what prunes the partitions before the last page
+        q = q.where(tuple_(Comment.created_at, Comment.id) > tuple_(last, after), Comment.created_at >= last)
+    result = await db.exec(q.order_by(Comment.created_at, Comment.id).limit(limit))
+    return result.all()
+
+
+def _among(ids: list[UUID]):
+    # one array parameter, so the statement is the same for any number of ids
+    return Comment.id == any_(bindparam("ids", ids, type_=ARRAY(Uuid)))
+
+
+async def approve_comments(db: AsyncSession, ids: list[UUID]) -> list[UUID]:
+    """Approve pending comments among `ids` in one UPDATE; returns those approved."""
+    result = await db.execute(
+        update(Comment)
+        .where(_among(ids), ~Comment.is_moderated)
+        .values(is_moderated=True, updated_at=get_utc_now())
+        .returning(Comment.id, Comment.post_id, Comment.created_at)
+    )
+    approved = result.all()
+    for post_id in {row.post_id for row in approved}:
+        enqueue(db, "comment.approved", {"post_id": str(post_id)})
+    await db.commit()
+    scorer = get_scorer()
+    for row in approved:
+        scorer.record(row.post_id, Activity.comment, row.created_at)
+    return [row.id for row in approved]
+
+
+async def reject_comments(db: AsyncSession, ids: list[UUID]) -> list[UUID]:
+    """Delete pending comments among `ids` in one DELETE; returns those removed.
+
+    Pending comments can't have replies (replies need an approved parent).
+    """
+    result = await db.execute(
+        delete(Comment).where(_among(ids), ~Comment.is_moderated).returning(Comment.id)
+    )
+    rejected = result.scalars().all()
+    await db.commit()
+    return rejected
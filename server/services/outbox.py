@@ -0,0 +1,185 @@
+"""Transactional outbox and background runner for post-write side effects.
+
+Request handlers call `enqueue` on the session that performs the write, so
+the event commits or rolls back together with it and the request does no
+extra work beyond one INSERT. Runners (in-process via the lifespan hook, or
+`python -m server.services.outbox` as any number of separate processes) claim
+batches with `FOR UPDATE SKIP LOCKED`, so concurrent runners never receive
+the same event, and dispatch them to the async handlers registered for the
+topic.
+
+A claim is a lease: it pushes `available_at` forward by OUTBOX_LEASE_SECONDS
+and commits, so a runner that dies mid-batch only delays its events. Failed
+events are retried with exponential backoff and marked "dead" after
+OUTBOX_MAX_ATTEMPTS. Delivery is at-least-once; handlers must be idempotent.
+"""
+import asyncio
+import logging
+import random
+from collections import defaultdict
+from datetime import timedelta
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import bindparam, delete, update
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..core.config import get_settings
+from ..core.db import async_session
+from ..core.utils import get_utc_now
+from ..models.outbox import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[dict[str, Any]], Awaitable[None]]
+
+_handlers: dict[str, list[Handler]] = defaultdict(list)
+
+BACKOFF_BASE = timedelta(seconds=2)
+BACKOFF_MAX = timedelta(hours=1)
+# processed events are kept this long for debugging, then deleted
+RETENTION = timedelta(days=7)
+PURGE_INTERVAL = timedelta(hours=1)
+
+
+def handler(topic: str) -> Callable[[Handler], Handler]:
+    """Register an async handler for `topic`; several may share a topic."""
+
+    def register(fn: Handler) -> Handler:
+        _handlers[topic].append(fn)
+        return fn
+
+    return register
+
+
+def enqueue(db: AsyncSession, topic: str, payload: dict[str, Any]) -> None:
+    """Stage an event on `db`; it is written by the caller's commit."""
+    db.add(OutboxEvent(topic=topic, payload=payload))
+
+
+def backoff(attempts: int) -> timedelta:
+    delay = min(BACKOFF_BASE * (2 ** (attempts - 1)), BACKOFF_MAX)
+    # jitter so events that failed together don't retry in lockstep
+    return delay * random.uniform(0.5, 1.0)
+
+
+async def _dispatch(topic: str, payload: dict[str, Any]) -> None:
+    for fn in _handlers.get(topic, ()):
+        await fn(payload)
+
+
+class OutboxRunner:
+    def __init__(self, batch_size: int, max_attempts: int, lease: timedelta, concurrency: int) -> None:
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.lease = lease
+        # each handler may hold a pooled connection; leave the rest to requests
+        self._slots = asyncio.Semaphore(concurrency)
+        self._last_purge = None
+
+    async def _dispatch_limited(self, topic: str, payload: dict[str, Any]) -> None:
+        async with self._slots:
+            await _dispatch(topic, payload)
+
+    async def claim(self, db: AsyncSession) -> list[tuple]:
+        now = get_utc_now()
+        claimable = (
+            select(OutboxEvent.id)
+            .where(OutboxEvent.status == "pending", OutboxEvent.available_at <= now)
+            .order_by(OutboxEvent.available_at)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            update(OutboxEvent)
+            .where(OutboxEvent.id.in_(claimable))
+            .values(available_at=now + self.lease, attempts=OutboxEvent.attempts + 1)
+            .returning(OutboxEvent.id, OutboxEvent.topic, OutboxEvent.payload, OutboxEvent.attempts)
+        )
+        result = await db.execute(stmt)
+        claimed = result.all()
+        await db.commit()
+        return claimed
+
+    async def run_once(self) -> int:
+        """Claim and process one batch. Returns the number of events claimed."""
+        async with async_session() as db:
+            claimed = await self.claim(db)
+        if not claimed:
+            return 0
+
+        outcomes = await asyncio.gather(
+            *(self._dispatch_limited(topic, payload) for _, topic, payload, _ in claimed), return_exceptions=True
+        )
+        now = get_utc_now()
+        done, failed = [], []
+        for (event_id, topic, _, attempts), outcome in zip(claimed, outcomes):
+            if not isinstance(outcome, BaseException):
+                done.append({"b_id": event_id, "b_status": "done", "b_available_at": now, "b_error": None, "b_processed_at": now})
+                continue
+            logger.warning("Outbox event %s (%s) failed on attempt %d: %r", event_id, topic, attempts, outcome)
+            dead = attempts >= self.max_attempts
+            failed.append({
+                "b_id": event_id,
+                "b_status": "dead" if dead else "pending",
+                "b_available_at": now if dead else now + backoff(attempts),
+                "b_error": repr(outcome)[:1000],
+                "b_processed_at": now if dead else None,
+            })
+
+        table = OutboxEvent.__table__
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("b_id"))
+            .values(
+                status=bindparam("b_status"),
+                available_at=bindparam("b_available_at"),
+                last_error=bindparam("b_error"),
+                processed_at=bindparam("b_processed_at"),
+            )
+        )
+        async with async_session() as db:
+            await db.execute(stmt, done + failed)
+            await db.commit()
+        return len(claimed)
+
+    async def purge(self) -> None:
+        cutoff = get_utc_now() - RETENTION
+        async with async_session() as db:
+            await db.execute(delete(OutboxEvent).where(OutboxEvent.status == "done", OutboxEvent.processed_at < cutoff))
+            await db.commit()
+
+    async def run(self, poll_interval: float) -> None:
+        """Process until cancelled; polls only while the outbox is drained."""
+        while True:
+            try:
+                claimed = await self.run_once()
+                now = get_utc_now()
+                if self._last_purge is None or now - self._last_purge > PURGE_INTERVAL:
+                    await self.purge()
+                    self._last_purge = now
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Outbox runner iteration failed")
+                claimed = 0
+            if claimed < self.batch_size:
+                await asyncio.sleep(poll_interval)
+
+
+def create_runner() -> OutboxRunner:
+    settings = get_settings()
+    # importing the handlers module registers them
+    from . import outbox_handlers  # noqa: F401
+
+    return OutboxRunner(
+        settings.OUTBOX_BATCH_SIZE,
+        settings.OUTBOX_MAX_ATTEMPTS,
+        timedelta(seconds=settings.OUTBOX_LEASE_SECONDS),
+        settings.OUTBOX_CONCURRENCY,
+    )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(create_runner().run(get_settings().OUTBOX_POLL_SECONDS))
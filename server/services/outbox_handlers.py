@@ -0,0 +1,36 @@
+"""Handlers for outbox topics (see `services.outbox`).
+
+Topics emitted today: "post.created", "post.updated", "comment.added",
+"comment.approved" and "user.registered". Topics without a handler are simply marked done, so new
+side effects (search indexing, notifications) only need a handler here.
+Handlers may run more than once per event and must be idempotent.
+"""
+from uuid import UUID
+
+from sqlalchemy import func, update
+from sqlmodel import select
+
+from ..core.db import async_session
+from ..models.comment import Comment
+from ..models.post import Post
+from .outbox import handler
+from .partitions import since_post
+
+
+@handler("comment.added")
+@handler("comment.approved")
+async def refresh_comments_count(payload: dict) -> None:
+    """Keep the denormalized `post.comments_count` (approved comments) in step.
+
+    Recounts instead of incrementing so a redelivered event can't double count.
+    """
+    post_id = UUID(payload["post_id"])
+    count = (
+        select(func.count())
+        .select_from(Comment)
+        .where(Comment.post_id == post_id, Comment.is_moderated, since_post(Comment.created_at, post_id))
+        .scalar_subquery()
+    )
+    async with async_session() as db:
+        await db.execute(update(Post).where(Post.id == post_id).values(comments_count=count))
+        await db.commit()
@@ -0,0 +1,194 @@
+"""Monthly partitions of `comment` and `postlike`, and their archival.
+
+Both tables are range-partitioned on created_at, one partition per calendar
+month (`<table>_YYYYMM`) plus `<table>_default` for rows outside all of them.
+`ensure_partitions` creates upcoming months ahead of time (from the lifespan
+hook, or `--ensure`), so inserts never fall into the default partition; a
+month whose rows already sit there can't get its own partition until they
+are moved. Each month keeps its own small indexes, and queries bounded on
+created_at only visit the months they cover (partition pruning).
+
+Old months are archived rather than deleted:
+
+    python -m server.services.partitions --archive-before 2025-01 --out DIR
+
+detaches each partition older than the given month, writes it to
+DIR/<partition>.csv.gz and drops it, which frees the space at once without a
+large DELETE or vacuum. A partition left detached by an interrupted run is
+picked up by the next one. To restore a month, create its partition again
+and load the file with
+`\\copy comment FROM PROGRAM 'gunzip -c comment_202401.csv.gz' WITH (FORMAT csv, HEADER)`.
+"""
+import argparse
+import asyncio
+import gzip
+import logging
+import os
+from datetime import date, datetime
+from pathlib import Path
+
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..core.config import get_settings
+from ..core.db import async_session
+from ..core.utils import get_utc_now
+from ..models.post import Post
+
+logger = logging.getLogger(__name__)
+
+TABLES = ("comment", "postlike")
+# arbitrary constant for pg_advisory_xact_lock
+LOCK_KEY = 0x7061727473  # "parts"
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_{month:%Y%m}"
+
+
+def since_post(created_at, post_id: UUID):
+    """`created_at >= <the post's created_at>`, true of all of a post's rows.
+
+    The planner can't prune on the subquery, but the executor does once it
+    has run, so reads of one post skip the months before it was written.
+    """
+    return created_at >= select(Post.created_at).where(Post.id == post_id).scalar_subquery()
+
+
+async def month_tables(db: AsyncSession, table: str) -> dict[date, bool]:
+    """Month tables of `table` that exist, mapped to whether they are attached."""
+    result = await db.execute(
+        text(
+            "SELECT relname, relispartition FROM pg_class "
+            "WHERE relnamespace = 'public'::regnamespace AND relkind = 'r' AND relname ~ :pattern"
+        ),
+        {"pattern": f"^{table}_[0-9]{{6}}$"},
+    )
+    return {datetime.strptime(name[-6:], "%Y%m").date(): attached for name, attached in result.all()}
+
+
+async def ensure_partitions(db: AsyncSession, months_ahead: int) -> list[str]:
+    """Create missing partitions from this month to `months_ahead` months out."""
+    # concurrent workers would race on the same CREATE TABLE
+    await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": LOCK_KEY})
+    this_month = month_start(get_utc_now().date())
+    created = []
+    for table in TABLES:
+        existing = await month_tables(db, table)
+        for offset in range(months_ahead + 1):
+            month = add_months(this_month, offset)
+            if month in existing:
+                continue
+            name = partition_name(table, month)
+            try:
+                # one savepoint each, so a blocked month doesn't undo the others
+                async with db.begin_nested():
+                    await db.execute(
+                        text(
+                            f'CREATE TABLE "{name}" PARTITION OF {table} '
+                            f"FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+                        )
+                    )
+            except IntegrityError:
+                logger.warning(
+                    "Partition %s not created: %s_default holds rows for %s; move them out first",
+                    name, table, f"{month:%Y-%m}",
+                )
+                continue
+            created.append(name)
+    await db.commit()
+    if created:
+        logger.info("Created partitions %s", ", ".join(created))
+    return created
+
+
+async def export_table(db: AsyncSession, name: str, path: Path) -> int:
+    """COPY a table to a gzipped CSV file, durably; returns the row count."""
+    conn = await db.connection()
+    raw = (await conn.get_raw_connection()).driver_connection
+    partial = path.with_name(path.name + ".partial")
+    with open(partial, "wb") as file:
+        with gzip.GzipFile(fileobj=file, mode="wb") as archive:
+            status = await raw.copy_from_table(name, output=archive, format="csv", header=True)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(partial, path)
+    return int(status.split()[-1])
+
+
+async def archive_partitions(db: AsyncSession, before: date, out_dir: Path) -> list[Path]:
+    """Detach, export and drop every monthly partition older than `before`."""
+    before = month_start(before)
+    if before > month_start(get_utc_now().date()):
+        raise ValueError("Only months before the current one can be archived")
+    out_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+    for table in TABLES:
+        for month, attached in sorted((await month_tables(db, table)).items()):
+            if month >= before:
+                continue
+            name = partition_name(table, month)
+            if attached:
+                # plain DETACH: CONCURRENTLY isn't allowed next to a default partition
+                await db.execute(text(f'ALTER TABLE {table} DETACH PARTITION "{name}"'))
+                await db.commit()
+            path = out_dir / f"{name}.csv.gz"
+            rows = await export_table(db, name, path)
+            await db.execute(text(f'DROP TABLE "{name}"'))
+            await db.commit()
+            logger.info("Archived %s (%d rows) to %s", name, rows, path)
+            written.append(path)
+    return written
+
+
+async def run(interval: float, months_ahead: int) -> None:
+    """Keep upcoming partitions in place until cancelled."""
+    while True:
+        try:
+            async with async_session() as db:
+                await ensure_partitions(db, months_ahead)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Partition maintenance failed")
+        await asyncio.sleep(interval)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m server.services.partitions")
+    parser.add_argument("--ensure", action="store_true", help="create upcoming monthly partitions")
+    parser.add_argument("--archive-before", metavar="YYYY-MM", help="archive partitions older than this month")
+    parser.add_argument("--out", type=Path, help="directory for archived partitions")
+    args = parser.parse_args()
+    if args.archive_before and args.out is None:
+        parser.error("--archive-before requires --out")
+    if not (args.ensure or args.archive_before):
+        parser.error("nothing to do: pass --ensure and/or --archive-before")
+
+    async with async_session() as db:
+        if args.ensure:
+            await ensure_partitions(db, get_settings().PARTITION_MONTHS_AHEAD)
+        if args.archive_before:
+            before = datetime.strptime(args.archive_before, "%Y-%m").date()
+            try:
+                await archive_partitions(db, before, args.out)
+            except ValueError as exc:
+                parser.error(str(exc))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
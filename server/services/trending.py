@@ -0,0 +1,210 @@
+"""Incrementally maintained trending ranking.
+
+Each like, comment or bookmark contributes `weight * exp(-(now - t) / tau)` to
+its post's score. Rather than decaying every score as time passes, events are
+scaled against a fixed epoch instead, `weight * exp((t - EPOCH) / tau)`, which
+multiplies every post's score by the same factor and so preserves the order.
+Those values grow without bound, so they are kept in log space and combined
+with log-add-exp.
+
+Workers buffer events in memory and periodically upsert the merged deltas into
+`postscore`; the upsert itself combines scores, so concurrent workers never
+overwrite each other. One worker at a time (guarded by an advisory lock)
+materializes the top `TRENDING_SIZE` published posts into `trendingpost`, which
+is all the feed endpoint reads.
+"""
+import argparse
+import asyncio
+import logging
+import math
+from datetime import datetime, timedelta
+from enum import Enum
+from functools import lru_cache
+from uuid import UUID
+
+from sqlalchemy import delete, func, literal, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..core.config import get_settings
+from ..core.db import async_session
+from ..core.utils import get_utc_now
+from ..models.post import Post
+from ..models.trending import PostScore, TrendingPost
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(2026, 1, 1)
+# arbitrary constant for pg_try_advisory_xact_lock
+MATERIALIZE_LOCK_KEY = 0x7472656E64  # "trend"
+# posts per upsert; asyncpg allows at most 32767 bind parameters
+FLUSH_CHUNK = 1000
+# exp() of anything below this is negligible next to 1 and underflows in Postgres
+_MIN_EXPONENT = -50.0
+
+
+class Activity(str, Enum):
+    like = "like"
+    comment = "comment"
+    bookmark = "bookmark"
+
+
+ACTIVITY_WEIGHTS = {
+    Activity.like: 1.0,
+    Activity.bookmark: 2.0,
+    Activity.comment: 3.0,
+}
+
+
+def logaddexp(a: float, b: float) -> float:
+    if a < b:
+        a, b = b, a
+    return a + math.log1p(math.exp(max(b - a, _MIN_EXPONENT)))
+
+
+class TrendingScorer:
+    def __init__(self, half_life_hours: float) -> None:
+        self.tau = half_life_hours * 3600 / math.log(2)
+        self._pending: dict[UUID, float] = {}
+
+    def log_weight(self, kind: Activity, at: datetime) -> float:
+        return math.log(ACTIVITY_WEIGHTS[kind]) + (at - EPOCH).total_seconds() / self.tau
+
+    def record(self, post_id: UUID | str, kind: Activity, at: datetime | None = None) -> None:
+        """Buffer one activity event; O(1), no I/O."""
+        post_id = post_id if isinstance(post_id, UUID) else UUID(post_id)
+        value = self.log_weight(kind, at or get_utc_now())
+        previous = self._pending.get(post_id)
+        self._pending[post_id] = value if previous is None else logaddexp(previous, value)
+
+    def _merge(self, deltas: dict[UUID, float]) -> None:
+        for post_id, value in deltas.items():
+            previous = self._pending.get(post_id)
+            self._pending[post_id] = value if previous is None else logaddexp(previous, value)
+
+    async def flush(self, db: AsyncSession) -> int:
+        """Upsert buffered deltas into `postscore`. Returns posts touched."""
+        if not self._pending:
+            return 0
+        deltas, self._pending = self._pending, {}
+        now = get_utc_now()
+        # sorted, so concurrent workers lock the rows in the same order
+        post_ids = sorted(deltas)
+        try:
+            for start in range(0, len(post_ids), FLUSH_CHUNK):
+                stmt = insert(PostScore).values(
+                    [
+                        {"post_id": post_id, "log_score": deltas[post_id], "updated_at": now}
+                        for post_id in post_ids[start:start + FLUSH_CHUNK]
+                    ]
+                )
+                current, incoming = PostScore.__table__.c.log_score, stmt.excluded.log_score
+                combined = func.greatest(current, incoming) + func.ln(
+                    1 + func.exp(func.greatest(-func.abs(current - incoming), _MIN_EXPONENT))
+                )
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["post_id"],
+                    set_={"log_score": combined, "updated_at": stmt.excluded.updated_at},
+                )
+                await db.execute(stmt)
+            await db.commit()
+        except BaseException:
+            # keep the events for the next attempt (or the shutdown flush
+            # when the loop was cancelled mid-flush)
+            self._merge(deltas)
+            raise
+        return len(deltas)
+
+    async def materialize(self, db: AsyncSession, size: int, max_age: timedelta) -> bool:
+        """Rebuild `trendingpost` unless another worker did so within `max_age`."""
+        locked = await db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": MATERIALIZE_LOCK_KEY})
+        if not locked.scalar():
+            await db.rollback()
+            return False
+        now = get_utc_now()
+        last = (await db.execute(select(func.max(TrendingPost.materialized_at)))).scalar()
+        if last is not None and now - last < max_age:
+            await db.rollback()
+            return False
+
+        ranked = (
+            select(
+                func.row_number().over(order_by=(PostScore.log_score.desc(), PostScore.post_id)),
+                PostScore.post_id,
+                PostScore.log_score,
+                literal(now),
+            )
+            .join(Post, Post.id == PostScore.post_id)
+            .where(Post.status == "published")
+            .order_by(PostScore.log_score.desc(), PostScore.post_id)
+            .limit(size)
+        )
+        await db.execute(delete(TrendingPost))
+        await db.execute(
+            insert(TrendingPost).from_select(["rank", "post_id", "log_score", "materialized_at"], ranked)
+        )
+        await db.commit()
+        return True
+
+    async def rebuild(self, db: AsyncSession) -> None:
+        """Recompute every score from the activity tables (backfill / half-life change)."""
+        # only approved comments count, as in the live path (add_comment, approve_comments)
+        sources = ((Activity.like, "postlike"), (Activity.comment, "comment WHERE is_moderated"), (Activity.bookmark, "bookmark"))
+        events = " UNION ALL ".join(
+            f"SELECT post_id, ln({ACTIVITY_WEIGHTS[kind]}) + extract(epoch FROM created_at - CAST(:epoch AS timestamp)) / CAST(:tau AS double precision) AS x FROM {source}"
+            for kind, source in sources
+        )
+        await db.execute(delete(PostScore))
+        await db.execute(
+            text(
+                f"""
+                WITH events AS ({events}),
+                peaks AS (SELECT post_id, x, max(x) OVER (PARTITION BY post_id) AS m FROM events)
+                INSERT INTO postscore (post_id, log_score, updated_at)
+                SELECT post_id, max(m) + ln(sum(exp(greatest(x - m, {_MIN_EXPONENT})))), :now
+                FROM peaks GROUP BY post_id
+                """
+            ),
+            {"epoch": EPOCH, "tau": self.tau, "now": get_utc_now()},
+        )
+        await db.commit()
+
+    async def run(self, flush_interval: float, refresh_interval: float, size: int) -> None:
+        """Background loop: flush every `flush_interval`, materialize every `refresh_interval`."""
+        next_refresh = 0.0
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                async with async_session() as db:
+                    await self.flush(db)
+                    if loop.time() >= next_refresh:
+                        await self.materialize(db, size, timedelta(seconds=refresh_interval / 2))
+                        next_refresh = loop.time() + refresh_interval
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Trending score update failed")
+            await asyncio.sleep(flush_interval)
+
+
+@lru_cache
+def get_scorer() -> TrendingScorer:
+    return TrendingScorer(get_settings().TRENDING_HALF_LIFE_HOURS)
+
+
+async def _rebuild() -> None:
+    scorer = get_scorer()
+    async with async_session() as db:
+        await scorer.rebuild(db)
+        await scorer.materialize(db, get_settings().TRENDING_SIZE, timedelta(0))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the trending ranking")
+    parser.add_argument("--rebuild", action="store_true", help="recompute all scores from activity tables")
+    args = parser.parse_args()
+    if args.rebuild:
+        asyncio.run(_rebuild())
+    else:
+        parser.print_help()
@@ -0,0 +1,149 @@
+"""Buffered view counting with HyperLogLog unique-visitor estimates.
+
+Post reads call `record`, which only touches in-process dicts: a view counter
+and a HyperLogLog sketch per (post, UTC day), kept sparse (a few bytes) until
+the post has hundreds of visitors that day. Every `VIEW_FLUSH_SECONDS` the
+buffers are swapped out and merged into `postviewstats` in one transaction,
+so the read path never writes a row and a crash loses at most one interval.
+
+Workers flush concurrently: the view count is incremented in SQL, and sketches
+are merged under row locks taken in key order (missing rows are created
+first with ON CONFLICT DO NOTHING), so no worker overwrites another's data.
+"""
+import asyncio
+import logging
+from datetime import date, timedelta
+from functools import lru_cache
+from uuid import UUID
+
+from fastapi import Request
+from sqlalchemy import bindparam, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..core.db import async_session
+from ..core.hyperloglog import HyperLogLog
+from ..core.utils import get_utc_now
+from ..models.post_view import PostViewStats
+
+logger = logging.getLogger(__name__)
+
+# keys per INSERT / SELECT; asyncpg allows at most 32767 bind parameters
+FLUSH_CHUNK = 1000
+
+
+def visitor_key(request: Request) -> str:
+    """Identify a visitor by client address and user agent (no cookies/auth)."""
+    host = request.client.host if request.client else ""
+    return f"{host}|{request.headers.get('user-agent', '')}"
+
+
+class ViewCounter:
+    def __init__(self) -> None:
+        self._views: dict[tuple[UUID, date], int] = {}
+        self._visitors: dict[tuple[UUID, date], HyperLogLog] = {}
+
+    def record(self, post_id: UUID, visitor: str, day: date | None = None) -> None:
+        """Count one view; O(1), no I/O."""
+        key = (post_id, day or get_utc_now().date())
+        self._views[key] = self._views.get(key, 0) + 1
+        sketch = self._visitors.get(key)
+        if sketch is None:
+            sketch = self._visitors[key] = HyperLogLog()
+        sketch.add(visitor)
+
+    def _restore(self, views: dict, visitors: dict) -> None:
+        for key, count in views.items():
+            self._views[key] = self._views.get(key, 0) + count
+            if key in self._visitors:
+                self._visitors[key].merge(visitors[key])
+            else:
+                self._visitors[key] = visitors[key]
+
+    async def flush(self, db: AsyncSession) -> int:
+        """Merge buffered counts into `postviewstats`. Returns rows touched."""
+        if not self._views:
+            return 0
+        views, visitors = self._views, self._visitors
+        self._views, self._visitors = {}, {}
+        # the same key order in every worker prevents lock-order deadlocks
+        keys = sorted(views)
+        try:
+            empty = HyperLogLog().to_bytes()
+            params = []
+            for start in range(0, len(keys), FLUSH_CHUNK):
+                chunk = keys[start:start + FLUSH_CHUNK]
+                await db.execute(
+                    insert(PostViewStats)
+                    .values([{"post_id": post_id, "day": day, "views": 0, "visitors": empty} for post_id, day in chunk])
+                    .on_conflict_do_nothing()
+                )
+                q = (
+                    select(PostViewStats.post_id, PostViewStats.day, PostViewStats.visitors)
+                    .where(tuple_(PostViewStats.post_id, PostViewStats.day).in_(chunk))
+                    .order_by(PostViewStats.post_id, PostViewStats.day)
+                    .with_for_update()
+                )
+                for post_id, day, stored in (await db.execute(q)).all():
+                    sketch = HyperLogLog.from_bytes(stored)
+                    sketch.merge(visitors[(post_id, day)])
+                    params.append({"b_post_id": post_id, "b_day": day, "b_views": views[(post_id, day)], "b_visitors": sketch.to_bytes()})
+
+            table = PostViewStats.__table__
+            stmt = (
+                update(table)
+                .where(table.c.post_id == bindparam("b_post_id"), table.c.day == bindparam("b_day"))
+                .values(views=table.c.views + bindparam("b_views"), visitors=bindparam("b_visitors"))
+            )
+            await db.execute(stmt, params)
+            await db.commit()
+        except BaseException:
+            # keep the counts for the next attempt (or the shutdown flush
+            # when the loop was cancelled mid-flush)
+            self._restore(views, visitors)
+            raise
+        return len(keys)
+
+    async def run(self, interval: float) -> None:
+        """Background loop: flush every `interval` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with async_session() as db:
+                    await self.flush(db)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("View stats flush failed")
+
+
+async def post_view_stats(db: AsyncSession, post_id: UUID, days: int) -> dict:
+    """Daily views and unique-visitor estimates for the last `days` days.
+
+    Covers flushed data only, so the newest interval may be missing.
+    """
+    since = get_utc_now().date() - timedelta(days=days - 1)
+    q = (
+        select(PostViewStats.day, PostViewStats.views, PostViewStats.visitors)
+        .where(PostViewStats.post_id == post_id, PostViewStats.day >= since)
+        .order_by(PostViewStats.day)
+    )
+    result = await db.exec(q)
+    total = HyperLogLog()
+    daily = []
+    for day, views, visitors in result.all():
+        sketch = HyperLogLog.from_bytes(visitors)
+        total.merge(sketch)
+        daily.append({"day": day, "views": views, "unique_visitors": sketch.count()})
+    return {
+        "post_id": post_id,
+        "views": sum(d["views"] for d in daily),
+        "unique_visitors": total.count(),
+        "days": daily,
+    }
+
+
+@lru_cache
+def get_view_counter() -> ViewCounter:
+    return ViewCounter()